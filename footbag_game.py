@@ -30,11 +30,9 @@ bg_color_change_speed = 0.5
 class Footbag:
     def __init__(self):
         self.base_radius = 15
-        self.position = pygame.Vector2(WIDTH // 2, HEIGHT // 2)
-        self.velocity = pygame.Vector2(random.uniform(-2, 2), -6)  # Reduced initial velocity
+        self.position = pygame.Vector2()
+        self.velocity = pygame.Vector2()
         self.gravity = 0.2  # Slightly reduced gravity
-        self.color_index = 0
-        self.color_timer = 0
         
         # Blob physics parameters
         self.num_points = 12  # Number of points around the blob
@@ -44,20 +42,30 @@ class Footbag:
         self.target_points = []  # Where points want to return to
         self.point_velocities = []  # Velocity of each point
         
-        # Initialize blob points in a circle
+        # Blob points sit in a circle around the centre
         for i in range(self.num_points):
             angle = 2 * math.pi * i / self.num_points
-            point = pygame.Vector2(
-                self.position.x + math.cos(angle) * self.base_radius,
-                self.position.y + math.sin(angle) * self.base_radius
-            )
-            self.points.append(point)
+            self.points.append(pygame.Vector2())
             self.target_points.append(pygame.Vector2(
                 math.cos(angle) * self.base_radius,
                 math.sin(angle) * self.base_radius
             ))
             self.point_velocities.append(pygame.Vector2(0, 0))
         
+        self.reset()
+        
+    def reset(self):
+        """Put the footbag back at its start, reusing its vectors."""
+        self.position.update(WIDTH // 2, HEIGHT // 2)
+        self.velocity.update(random.uniform(-2, 2), -6)  # Reduced initial velocity
+        self.color_index = 0
+        self.color_timer = 0
+        
+        # Initialize blob points in a circle
+        for point, target, point_velocity in zip(self.points, self.target_points, self.point_velocities):
+            point.update(self.position + target)
+            point_velocity.update(0, 0)
+        
         # Track collisions for deformation effects
         self.last_collision = None
         self.collision_timer = 0
@@ -173,8 +181,8 @@ class Leg:
         self.thigh_width = 25
         
         # Joint positions
-        self.ankle_pos = pygame.Vector2(WIDTH // 2, HEIGHT - 50)
-        self.knee_pos = pygame.Vector2(WIDTH // 2, HEIGHT - 150)
+        self.ankle_pos = pygame.Vector2()
+        self.knee_pos = pygame.Vector2()
         self.hip_pos = pygame.Vector2(WIDTH // 2, HEIGHT - 270)  # Centered at the bottom of the screen
         
         # Colors
@@ -182,6 +190,13 @@ class Leg:
         self.calf_color = COLORS[3]
         self.thigh_color = COLORS[4]
         
+        self.reset()
+        
+    def reset(self):
+        """Put the leg back in its rest pose."""
+        self.ankle_pos.update(self.hip_pos.x, HEIGHT - 50)
+        self.knee_pos.update(self.hip_pos.x, HEIGHT - 150)
+        
     def update(self, mouse_pos):
         # Ankle directly follows mouse - this is what we want
         ankle_target = pygame.Vector2(mouse_pos[0], min(mouse_pos[1], HEIGHT - 20))
@@ -425,9 +440,15 @@ class Game:
     def __init__(self):
         self.leg = Leg()
         self.footbag = Footbag()
+        self.font = pygame.font.Font(None, 48)
+        self.reset()
+        
+    def reset(self):
+        """Restart the game in place, keeping the objects and the font."""
+        self.leg.reset()
+        self.footbag.reset()
         self.running = True
         self.score = 0
-        self.font = pygame.font.Font(None, 48)
         
     def handle_events(self):
         for event in pygame.event.get():
@@ -506,7 +527,7 @@ class Game:
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         # Restart game
-                        self.__init__()
+                        self.reset()
                         waiting = False
                     elif event.key == pygame.K_ESCAPE:
                         pygame.quit()
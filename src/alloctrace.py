@@ -0,0 +1,240 @@
+import collections
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class AllocationTracer:
+    """Diagnostic mode that traces allocations and GC pauses inside Game.update and Game.draw.
+
+    Traces are cleared before each wrapped call and snapshotted after it, so the snapshot
+    holds exactly the allocations the call made and left alive, grouped per call site
+    (e.g. Vector2s, point lists, rendered Font surfaces kept for the frame).
+
+    Temporaries freed before the call returns (the Vector2s of Footbag.update, say) are
+    gone by then, so a line tracer runs during the call as well: at every line of this
+    package it reads the traced memory peak since the previous line, charges the rise over
+    that line's starting level to the line, and resets the peak. A line's transient bytes
+    are thus the most memory it held at once, including what it allocated and freed again
+    (calls into code outside the package count towards the calling line). The tracer slows
+    every line down, so frame times are only comparable with each other. Pixel buffers
+    allocated inside SDL are not seen by tracemalloc.
+
+    GC callbacks time every collection and record which phase of which frame it landed in.
+    """
+
+    def __init__(self, game, keep_frames=600, top=5):
+        self.game = game
+        self.top = top
+        self.frame = 0
+        self.phase = None  # Phase currently running, if any
+        self.frames = collections.deque(maxlen=keep_frames)  # Recent per-phase records
+        self.sites = {}  # (file, line) -> [objects, bytes, calls it allocated in]
+        self.lines = {}  # (file, line) -> [transient bytes, calls it allocated in]
+        self.phase_totals = collections.defaultdict(lambda: [0, 0, 0, 0.0])  # calls, net bytes, peak bytes, seconds
+        self.gc_pauses = []  # (frame, phase, generation, seconds, collected)
+        self._gc_start = None
+        self._originals = {}
+
+        # Line tracer state during a wrapped call
+        self._line = None  # (file, line) running now, or None outside the package
+        self._line_start = 0  # Traced memory when it started
+        self._call_lines = {}  # (file, line) -> transient bytes in this call
+        self._call_peak = 0
+        self._memory = None  # Last (current, peak) read, kept alive until the next one
+        self._call_overhead = 0  # Bytes of the frame object tracing creates for a call, see _calibrate()
+        self._local_trace = self._trace_lines  # Bound once, so returning it allocates nothing
+
+    def install(self):
+        """Start tracing and wrap the game's update and draw methods."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+        self._calibrate()
+        gc.callbacks.append(self._on_gc)
+        for name in ("update", "draw"):
+            original = getattr(self.game, name)
+            self._originals[name] = original
+            setattr(self.game, name, self._wrap(name, original))
+
+    def uninstall(self):
+        for name, original in self._originals.items():
+            setattr(self.game, name, original)
+        self._originals.clear()
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        tracemalloc.stop()
+
+    def _wrap(self, phase, method):
+        def traced(*args, **kwargs):
+            if phase == "update":
+                self.frame += 1
+            tracemalloc.clear_traces()
+            self.phase = phase
+            self._start_lines()
+            sys.settrace(self._trace_calls)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                sys.settrace(None)
+                elapsed = time.perf_counter() - start
+                self._charge(tracemalloc.get_traced_memory()[1], None)
+                self.phase = None
+                current = tracemalloc.get_traced_memory()[0]
+                self._record(phase, elapsed, current, self._call_peak, tracemalloc.take_snapshot().statistics("lineno"))
+        return traced
+
+    def _calibrate(self):
+        """Measure the frame object tracing creates for every call, to keep it off the calling line."""
+        source = "def noop():\n    pass\n\ndef call():\n    noop()\n"
+        filename = os.path.join(SRC_DIR, "<calibration>")  # Inside the package, so its lines are traced
+        namespace = {}
+        exec(compile(source, filename, "exec"), namespace)
+        self._call_overhead = 0
+        self._start_lines()
+        sys.settrace(self._trace_calls)
+        namespace["call"]()
+        sys.settrace(None)
+        self._charge(tracemalloc.get_traced_memory()[1], None)
+        self._call_overhead = self._call_lines.get((filename, 5), 0)
+
+    @staticmethod
+    def _traced_file(filename):
+        return filename.startswith(SRC_DIR) and filename != __file__
+
+    def _trace_calls(self, frame, event, arg):
+        memory = self._memory = tracemalloc.get_traced_memory()
+        # The frame object tracing has just created for this call is the tracer's, not the line's
+        if memory[0] == memory[1]:
+            self._line_start += self._call_overhead
+        self._charge(memory[1], self._line)
+        # Follow the lines of the package's own functions only
+        return self._local_trace if self._traced_file(frame.f_code.co_filename) else None
+
+    def _trace_lines(self, frame, event, arg):
+        # Read the peak before the tracer allocates anything itself
+        memory = self._memory = tracemalloc.get_traced_memory()
+        if event == "line":
+            line = (frame.f_code.co_filename, frame.f_lineno)
+        elif event == "return":
+            # The rest of the calling line is charged to it again
+            caller = frame.f_back
+            if caller is not None and self._traced_file(caller.f_code.co_filename):
+                line = (caller.f_code.co_filename, caller.f_lineno)
+            else:
+                line = None
+        else:
+            line = self._line
+        self._charge(memory[1], line)
+        return self._local_trace
+
+    def _start_lines(self):
+        self._call_lines = {}
+        self._call_peak = 0
+        self._line = None
+        self._charge(tracemalloc.get_traced_memory()[1], None)
+
+    def _charge(self, peak, line):
+        """Charge `peak` to the line that ran since the last charge, and start measuring `line`."""
+        # Nothing the tracer allocates may be freed after the reset below, or the line would
+        # start below its measured level: the values read are kept in self._memory, and
+        # no local holds a fresh object
+        if peak > self._call_peak:
+            self._call_peak = peak
+        if self._line is not None and peak > self._line_start:
+            self._call_lines[self._line] = self._call_lines.get(self._line, 0) + (peak - self._line_start)
+        self._line = line
+        # Everything above is part of the next line's starting level; the second reset
+        # drops the tuple get_traced_memory() itself allocates from the peak
+        tracemalloc.reset_peak()
+        self._line_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def _record(self, phase, elapsed, net_bytes, peak_bytes, statistics):
+        sites = []
+        for statistic in statistics:
+            # Only attribute allocations made from the game's own source lines
+            frame = statistic.traceback[0]
+            if not frame.filename.startswith(SRC_DIR) or frame.filename == __file__:
+                continue
+            key = (frame.filename, frame.lineno)
+            totals = self.sites.setdefault(key, [0, 0, 0])
+            totals[0] += statistic.count
+            totals[1] += statistic.size
+            totals[2] += 1
+            sites.append((key, statistic.count, statistic.size))
+        sites.sort(key=lambda site: site[2], reverse=True)
+
+        for key, size in self._call_lines.items():
+            totals = self.lines.setdefault(key, [0, 0])
+            totals[0] += size
+            totals[1] += 1
+        temporaries = sorted(self._call_lines.items(), key=lambda line: line[1], reverse=True)
+
+        totals = self.phase_totals[phase]
+        totals[0] += 1
+        totals[1] += net_bytes
+        totals[2] += peak_bytes
+        totals[3] += elapsed
+        self.frames.append({
+            "frame": self.frame,
+            "phase": phase,
+            "seconds": elapsed,
+            "net_bytes": net_bytes,
+            "peak_bytes": peak_bytes,
+            "sites": sites[:self.top],
+            "temporaries": temporaries[:self.top],
+        })
+
+    def _on_gc(self, event, info):
+        if event == "start":
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            pause = time.perf_counter() - self._gc_start
+            self._gc_start = None
+            self.gc_pauses.append((self.frame, self.phase, info["generation"], pause, info["collected"]))
+
+    @staticmethod
+    def _site_name(key):
+        filename, lineno = key
+        return f"{os.path.relpath(filename, os.path.dirname(SRC_DIR))}:{lineno}"
+
+    def report(self, spikes=5):
+        """Return a text report of allocations, GC pauses and the slowest frames."""
+        lines = ["Per phase (mean per call):"]
+        for phase, (calls, net, peak, seconds) in self.phase_totals.items():
+            lines.append(f"  {phase:8s} {calls:7d} calls  {seconds / calls * 1e3:8.3f} ms  "
+                         f"net {net / calls:9.0f} B  transient peak {peak / calls:9.0f} B")
+
+        lines.append("Call sites leaving allocations behind (totals):")
+        ranked = sorted(self.sites.items(), key=lambda item: item[1][1], reverse=True)
+        for key, (objects, size, calls) in ranked[:self.top * 3]:
+            lines.append(f"  {self._site_name(key):28s} {objects:9d} objects {size:11d} B in {calls} calls")
+
+        lines.append("Lines allocating the most, temporaries included (transient bytes, totals):")
+        ranked = sorted(self.lines.items(), key=lambda item: item[1][0], reverse=True)
+        for key, (size, calls) in ranked[:self.top * 3]:
+            lines.append(f"  {self._site_name(key):28s} {size:11d} B in {calls} calls")
+
+        in_frame = [pause for pause in self.gc_pauses if pause[1] is not None]
+        lines.append(f"GC pauses: {len(self.gc_pauses)} total, {len(in_frame)} inside frames")
+        if in_frame:
+            worst = max(in_frame, key=lambda pause: pause[3])
+            total = sum(pause[3] for pause in in_frame)
+            lines.append(f"  inside frames: {total * 1e3:.3f} ms total, worst {worst[3] * 1e3:.3f} ms "
+                         f"(gen {worst[2]}, frame {worst[0]} {worst[1]})")
+
+        lines.append("Slowest recent calls:")
+        pauses_by_frame = collections.defaultdict(list)
+        for frame, phase, generation, pause, collected in in_frame:
+            pauses_by_frame[(frame, phase)].append(f"gen{generation} {pause * 1e3:.3f} ms")
+        for record in sorted(self.frames, key=lambda record: record["seconds"], reverse=True)[:spikes]:
+            gc_note = ", ".join(pauses_by_frame.get((record["frame"], record["phase"]), [])) or "no GC"
+            sites = ", ".join(f"{self._site_name(key)} +{count}/{size} B" for key, count, size in record["sites"])
+            temporaries = ", ".join(f"{self._site_name(key)} {size} B" for key, size in record["temporaries"])
+            lines.append(f"  frame {record['frame']} {record['phase']}: {record['seconds'] * 1e3:.3f} ms, "
+                         f"{gc_note}; retained: {sites or 'none'}; transient: {temporaries or 'none'}")
+        return "\n".join(lines)
@@ -0,0 +1,215 @@
+import argparse
+import math
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+from src.constants import WIDTH, HEIGHT, FPS, COLORS
+from src.game import Game, spawn_seeds
+from src.persistence import ScoreStore
+from src.resources import Resources
+from src.softbody import SoftBodySolver
+from src.state import GameState
+
+class ArenaBlock:
+    """Shared-memory block holding the latest state of many arenas.
+
+    The block is a stop flag, one sequence number per arena and one GameState row per
+    arena. Each arena has a single writer, which publishes seqlock style: it makes the
+    sequence number odd, packs the row in place and makes it even again. A reader copies
+    the row between two reads of the sequence number and keeps the copy only if the
+    number was even and did not change, so it never sees a half-written frame and the
+    writer never waits. A sequence number of zero means nothing has been published yet.
+    """
+
+    def __init__(self, num_arenas, row_size, name=None):
+        header = 8 * (1 + num_arenas)
+        create = name is None
+        size = header + 8 * num_arenas * row_size if create else 0
+        self.shm = shared_memory.SharedMemory(name, create=create, size=size)
+        self.name = self.shm.name
+        self.control = np.ndarray((1,), np.uint64, self.shm.buf)
+        self.seqs = np.ndarray((num_arenas,), np.uint64, self.shm.buf, offset=8)
+        self.rows = np.ndarray((num_arenas, row_size), np.float64, self.shm.buf, offset=header)
+
+    @property
+    def stopped(self):
+        return bool(self.control[0])
+
+    def stop(self):
+        self.control[0] = 1
+
+    def publish(self, index, state):
+        """Pack the game of `state` into the slot of arena `index`."""
+        seqs = self.seqs
+        seqs[index] += 1  # Odd: write in progress
+        state.pack(self.rows[index])
+        seqs[index] += 1
+
+    def read(self, index, out, retries=4):
+        """Copy a consistent row of arena `index` into `out`.
+
+        Returns its sequence number, or 0 if no consistent row could be read (nothing
+        published yet, or the writer kept getting in the way).
+        """
+        seqs = self.seqs
+        row = self.rows[index]
+        for _ in range(retries):
+            before = int(seqs[index])
+            if before == 0:
+                return 0
+            if before & 1:
+                continue
+            out[:] = row
+            if int(seqs[index]) == before:
+                return before
+        return 0
+
+    def close(self):
+        # The array views must go before the mapping can be closed
+        del self.control, self.seqs, self.rows
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+def create_mirror(num_footbags, num_players, resources):
+    """A Game that is only ever unpacked into and drawn, never updated."""
+    return Game(ScoreStore(":memory:"), num_footbags=num_footbags, num_players=num_players, resources=resources)
+
+def run_worker(name, num_arenas, index, seed, options, speed):
+    """Simulate one arena and publish every frame into the block `name`.
+
+    With `speed` the game is paced to that multiple of real time; with 0 it runs flat out.
+    """
+    # Only the workers run headless; the viewer keeps its window
+    from src.headless import create_game
+    game = create_game(seed=seed, **options)
+    state = GameState(game)
+    block = ArenaBlock(num_arenas, state.size, name)
+    frame_time = 1 / (FPS * speed) if speed else 0
+    deadline = time.perf_counter()
+    try:
+        while not block.stopped:
+            game.update()
+            if not game.running:
+                game.store.submit(game.session.finish(game.score))
+                game.reset()
+            block.publish(index, state)
+            if frame_time:
+                deadline = max(deadline + frame_time, time.perf_counter())
+                time.sleep(max(0.0, deadline - time.perf_counter()))
+    finally:
+        block.close()
+
+def tile_rects(count, window_size):
+    """Lay out `count` world-shaped tiles in a grid filling the window."""
+    window_width, window_height = window_size
+    best = None
+    for columns in range(1, count + 1):
+        rows = math.ceil(count / columns)
+        scale = min(window_width / columns / WIDTH, window_height / rows / HEIGHT)
+        if best is None or scale > best[0]:
+            best = (scale, columns)
+    scale, columns = best
+    width, height = int(WIDTH * scale), int(HEIGHT * scale)
+    return [pygame.Rect((i % columns) * width, (i // columns) * height, width - 1, height - 1) for i in range(count)]
+
+def draw_arena(game, surface, label):
+    """Draw the legs, footbags and score of an arena, scaled to the surface width."""
+    scale = surface.get_width() / WIDTH
+    # A darkened background keeps the footbags visible whatever the colours
+    surface.fill(tuple(channel // 3 for channel in COLORS[game.bg_color_index]))
+    for leg in game.legs:
+        leg.draw(surface)
+    for footbag in game.footbags:
+        footbag.draw(surface)
+    text = game.resources.text(max(10, round(36 * scale)), f"{label}  {game.score}", (255, 255, 255))
+    surface.blit(text, (8 * scale, 8 * scale))
+
+def view(num_arenas, seed=None, num_footbags=1, num_players=1, soft_body_iterations=0, speed=1.0,
+         window_size=(1280, 720), seconds=None):
+    """Run `num_arenas` headless games in worker processes and show them all in one window.
+
+    Workers publish into an ArenaBlock; the viewer reads every arena's latest row, unpacks
+    it into a mirror Game and draws it into its tile. Tiles whose arena has not published
+    a new frame are left as they are. Returns (frames drawn, seconds, torn reads).
+    """
+    pygame.init()
+    window = pygame.display.set_mode(window_size)
+    pygame.display.set_caption(f"Psychedelic Footbag - {num_arenas} arenas")
+    resources = Resources()
+    mirrors = [create_mirror(num_footbags, num_players, resources) for _ in range(num_arenas)]
+    states = [GameState(mirror) for mirror in mirrors]
+    row = np.zeros(states[0].size)
+    tiles = [window.subsurface(rect) for rect in tile_rects(num_arenas, window.get_size())]
+    seen = [0] * num_arenas
+
+    block = ArenaBlock(num_arenas, row.size)
+    # Fresh interpreters for the workers, so they do not inherit the viewer's window
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    for index, worker_seed in enumerate(spawn_seeds(seed, num_arenas)):
+        soft_body = SoftBodySolver(soft_body_iterations) if soft_body_iterations else None
+        worker_options = {"num_footbags": num_footbags, "num_players": num_players, "soft_body": soft_body}
+        worker = context.Process(target=run_worker, daemon=True,
+                                 args=(block.name, num_arenas, index, worker_seed, worker_options, speed))
+        worker.start()
+        workers.append(worker)
+
+    clock = pygame.time.Clock()
+    frames = 0
+    torn = 0
+    start = time.perf_counter()
+    running = True
+    try:
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    running = False
+            for index, (mirror, tile) in enumerate(zip(mirrors, tiles)):
+                # Nothing new (or nothing yet) from this arena
+                if int(block.seqs[index]) in (0, seen[index]):
+                    continue
+                seq = block.read(index, row)
+                if not seq:
+                    torn += 1
+                    continue
+                seen[index] = seq
+                states[index].unpack(row)
+                draw_arena(mirror, tile, f"#{index}")
+            pygame.display.flip()
+            clock.tick(FPS)
+            frames += 1
+            if seconds is not None and time.perf_counter() - start >= seconds:
+                running = False
+    finally:
+        block.stop()
+        for worker in workers:
+            worker.join(timeout=5)
+        block.close()
+        block.unlink()
+    return frames, time.perf_counter() - start, torn
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch many headless Psychedelic Footbag games at once")
+    parser.add_argument("--arenas", type=int, default=16, help="number of games, one worker process each")
+    parser.add_argument("--seed", type=int, help="seed the workers' streams are spawned from")
+    parser.add_argument("--footbags", type=int, default=1, help="footbags per arena")
+    parser.add_argument("--players", type=int, default=1, help="bot-played legs per arena")
+    parser.add_argument("--soft-body", type=int, default=0, metavar="ITERATIONS",
+                        help="keep blob edge lengths and area with this many solver iterations")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="simulation speed as a multiple of real time (0 runs the workers flat out)")
+    parser.add_argument("--size", default="1280x720", help="window size, WIDTHxHEIGHT")
+    parser.add_argument("--seconds", type=float, help="close the viewer after this long")
+    args = parser.parse_args()
+
+    window_size = tuple(int(value) for value in args.size.split("x"))
+    frames, seconds, torn = view(args.arenas, args.seed, args.footbags, args.players, args.soft_body, args.speed,
+                                 window_size, args.seconds)
+    print(f"{frames} viewer frames in {seconds:.1f}s ({frames / seconds:.0f} fps), {torn} torn reads skipped")
+
+if __name__ == "__main__":
+    main()
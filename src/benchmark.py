@@ -0,0 +1,382 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import time
+import uuid
+
+# Headless runs never open a real window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from src.constants import WIDTH, HEIGHT
+from src.footbag import Footbag
+from src.leg import Leg
+from src.headless import create_game
+from src.sprites import FootbagSprites
+from src.rollback import create_peers
+from src.softbody import SoftBodySolver
+from src.ik import solve_legs
+from src.trails import MotionTrails
+from src.scenario import Scenario
+
+# Default location of the benchmark history
+DEFAULT_HISTORY_PATH = os.path.join(".benchmarks", "history.jsonl")
+
+class StillInput:
+    """Input source that never moves, for benchmarking collisions."""
+
+    def get_pos(self):
+        return (WIDTH // 2, HEIGHT - 150)
+
+    def get_velocity(self):
+        return pygame.Vector2(0, 0)
+
+def bench_footbag_update(batch):
+    footbag = Footbag(rng=np.random.default_rng(0))
+    def run():
+        for _ in range(batch):
+            footbag.update()
+            # Keep it in the arena
+            if footbag.position.y > HEIGHT:
+                footbag.position.y = HEIGHT // 2
+                footbag.velocity.y = -8
+    return run
+
+def bench_leg_update(batch):
+    leg = Leg()
+    targets = np.random.default_rng(0).uniform((0, 0), (WIDTH, HEIGHT), (batch, 2)).tolist()
+    def run():
+        for target in targets:
+            leg.update(target)
+    return run
+
+def bench_solve_legs(batch, count=4096):
+    rng = np.random.default_rng(0)
+    hips = np.column_stack((rng.uniform(0, WIDTH, count), np.full(count, HEIGHT - 270)))
+    targets = hips + rng.normal(0, 250, (count, 2))
+    leg = Leg()
+    def run():
+        for _ in range(batch):
+            solve_legs(hips, targets, leg.thigh_length, leg.calf_length)
+    return run
+
+def bench_leg_collision(batch):
+    leg = Leg()
+    leg.input = StillInput()
+    footbag = Footbag()
+    # Just off the knee end of the calf, within its bounding-circle early-out but between
+    # blob points, so the foot test and the calf test's point loop run every call without
+    # a hit (reset moves the points and geometry along with the position)
+    footbag.reset((leg.knee_pos.x + 21, leg.knee_pos.y - 21))
+    def run():
+        for _ in range(batch):
+            leg.check_footbag_collision(footbag)
+    return run
+
+def bench_game_update(batch):
+    game = create_game(seed=0)
+    def run():
+        for _ in range(batch):
+            game.update()
+            if not game.running:
+                game.reset()
+    return run
+
+def bench_game_reset(batch):
+    game = create_game(seed=0)
+    def run():
+        for _ in range(batch):
+            game.reset()
+    return run
+
+def bench_game_draw(batch):
+    game = create_game(seed=0)
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    game.update()
+    def run():
+        for _ in range(batch):
+            game.draw(surface)
+    return run
+
+def bench_game_draw_trails(batch):
+    game = create_game(seed=0)
+    game.trails = MotionTrails()
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    game.update()
+    def run():
+        for _ in range(batch):
+            game.draw(surface)
+    return run
+
+def bench_scenario(name):
+    """Workload running game.update on the game set up by an example scenario.
+
+    The scenario starts over after a game over and when its ankle paths run out, so
+    scripted legs never stand still however many frames are timed.
+    """
+    def bench(batch):
+        scenario = Scenario.load(name)
+        game = scenario.build_game()
+        frame = 0
+        def run():
+            nonlocal frame
+            for _ in range(batch):
+                game.update()
+                frame += 1
+                if not game.running or frame == scenario.frames:
+                    game.reset()
+                    scenario.set_up(game)
+                    frame = 0
+        return run
+    return bench
+
+def bench_draw_animated_title(batch):
+    game = create_game(seed=0)
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    def run():
+        for _ in range(batch):
+            game.draw_animated_title(surface)
+            game.title_wave_time += game.title_wave_speed
+    return run
+
+def juggling_footbags(count=200, frames=30):
+    rng = np.random.default_rng(0)
+    footbags = [Footbag(position, rng) for position in rng.uniform((50, 50), (WIDTH - 50, HEIGHT - 50), (count, 2)).tolist()]
+    for _ in range(frames):
+        for footbag in footbags:
+            footbag.update()
+    return footbags
+
+def bench_footbags_draw(batch):
+    footbags = juggling_footbags()
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    def run():
+        for _ in range(batch):
+            for footbag in footbags:
+                footbag.draw(surface)
+    return run
+
+def bench_footbags_draw_sprites(batch):
+    footbags = juggling_footbags()
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    sprites = FootbagSprites()
+    def run():
+        for _ in range(batch):
+            sprites.draw(surface, footbags)
+    return run
+
+def bench_softbody_solve(batch, count=1):
+    footbags = juggling_footbags(count)
+    solver = SoftBodySolver()
+    def run():
+        for _ in range(batch):
+            solver.solve(footbags)
+    return run
+
+def bench_softbody_solve_many(batch):
+    return bench_softbody_solve(batch, 200)
+
+def rollback_session(frames=120):
+    network, sessions = create_peers(latency=3, loss=0.0)
+    for _ in range(frames):
+        for session in sessions:
+            session.tick()
+        network.advance()
+    return sessions[0]
+
+def bench_rollback_save(batch):
+    session = rollback_session()
+    def run():
+        for _ in range(batch):
+            session.save(session.frame)
+    return run
+
+def bench_rollback_load(batch):
+    session = rollback_session()
+    session.save(session.frame)
+    def run():
+        for _ in range(batch):
+            session.load(session.frame)
+    return run
+
+def bench_rollback_resimulate(batch, frames=8):
+    session = rollback_session()
+    first = session.frame - frames
+    def run():
+        for _ in range(batch):
+            session.load(first)
+            session.resimulate(first, session.frame)
+    return run
+
+# Workload name -> (setup function, calls per sample)
+WORKLOADS = {
+    "footbag.update": (bench_footbag_update, 1000),
+    "leg.update": (bench_leg_update, 1000),
+    "ik.solve_legs_4096": (bench_solve_legs, 20),
+    "leg.check_footbag_collision": (bench_leg_collision, 1000),
+    "game.update": (bench_game_update, 200),
+    "game.reset": (bench_game_reset, 200),
+    "game.draw": (bench_game_draw, 20),
+    "game.draw_trails": (bench_game_draw_trails, 20),
+    "game.draw_animated_title": (bench_draw_animated_title, 20),
+    "footbags.draw": (bench_footbags_draw, 10),
+    "footbags.draw_sprites": (bench_footbags_draw_sprites, 10),
+    "softbody.solve": (bench_softbody_solve, 200),
+    "softbody.solve_200": (bench_softbody_solve_many, 5),
+    "rollback.save": (bench_rollback_save, 1000),
+    "rollback.load": (bench_rollback_load, 1000),
+    "rollback.resimulate_8": (bench_rollback_resimulate, 10),
+    "scenario.calf_rain": (bench_scenario("calf_rain"), 5),
+    "scenario.max_speed_kicks": (bench_scenario("max_speed_kicks"), 100),
+}
+
+def git_commit():
+    """Return the current commit, marked dirty if the tree has local changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+def machine_fingerprint():
+    """Short hash identifying the machine and runtime the numbers were taken on."""
+    parts = [platform.node(), platform.machine(), platform.processor(), str(os.cpu_count()),
+             platform.python_version(), pygame.version.ver, np.__version__]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+def run_benchmarks(names=None, samples=30, warmup=3):
+    """Time each workload and return {name: per-call seconds for each sample}."""
+    if not pygame.get_init():
+        pygame.init()
+    results = {}
+    for name in names or WORKLOADS:
+        setup, batch = WORKLOADS[name]
+        run = setup(batch)
+        for _ in range(warmup):
+            run()
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) / batch)
+        results[name] = timings
+    return results
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as history:
+        return [json.loads(line) for line in history if line.strip()]
+
+def append_history(path, record):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as history:
+        history.write(json.dumps(record) + "\n")
+
+def find_run(runs, key):
+    """Find a run by id or commit prefix, or by negative index (-1 is the latest)."""
+    try:
+        return runs[int(key)]
+    except (ValueError, IndexError):
+        pass
+    for run in reversed(runs):
+        if run["id"].startswith(key) or run["commit"].startswith(key):
+            return run
+    raise SystemExit(f"No run matches {key!r}")
+
+def bootstrap_ratio(baseline, candidate, resamples=2000, confidence=0.95, rng=None):
+    """Bootstrap confidence interval for median(candidate) / median(baseline).
+
+    Returns (ratio, low, high).
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    baseline = np.asarray(baseline)
+    candidate = np.asarray(candidate)
+    base_samples = rng.choice(baseline, (resamples, len(baseline)))
+    cand_samples = rng.choice(candidate, (resamples, len(candidate)))
+    ratios = np.median(cand_samples, axis=1) / np.median(base_samples, axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(ratios, [alpha, 1 - alpha])
+    return float(np.median(candidate) / np.median(baseline)), float(low), float(high)
+
+def compare_runs(baseline, candidate, threshold=0.05):
+    """Compare two runs workload by workload.
+
+    Returns rows of (name, ratio, low, high, verdict). A workload is a regression when
+    the whole confidence interval is more than `threshold` slower.
+    """
+    rows = []
+    for name in baseline["results"]:
+        if name not in candidate["results"]:
+            continue
+        ratio, low, high = bootstrap_ratio(baseline["results"][name], candidate["results"][name])
+        if low > 1 + threshold:
+            verdict = "REGRESSION"
+        elif high < 1 - threshold:
+            verdict = "improvement"
+        else:
+            verdict = ""
+        rows.append((name, ratio, low, high, verdict))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and compare Psychedelic Footbag benchmarks")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="benchmark history file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and record the results")
+    run_parser.add_argument("--samples", type=int, default=30, help="samples per workload")
+    run_parser.add_argument("--workload", action="append", choices=sorted(WORKLOADS), help="only run these")
+    run_parser.add_argument("--note", default="", help="free-form note stored with the run")
+
+    commands.add_parser("list", help="list recorded runs")
+
+    compare_parser = commands.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("baseline", nargs="?", default="-2", help="run id, commit prefix or index")
+    compare_parser.add_argument("candidate", nargs="?", default="-1", help="run id, commit prefix or index")
+    compare_parser.add_argument("--threshold", type=float, default=0.05, help="relative slowdown to flag")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_benchmarks(args.workload, args.samples)
+        record = {
+            "id": uuid.uuid4().hex[:8],
+            "timestamp": time.time(),
+            "commit": git_commit(),
+            "machine": machine_fingerprint(),
+            "note": args.note,
+            "results": results,
+        }
+        append_history(args.history, record)
+        print(f"Recorded run {record['id']} at {record['commit'][:12]} on {record['machine']}")
+        for name, timings in results.items():
+            median = float(np.median(timings))
+            print(f"  {name:30s} {median * 1e6:10.2f} us/call {1 / median:12.0f} calls/s")
+
+    elif args.command == "list":
+        for index, run in enumerate(load_history(args.history)):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["timestamp"]))
+            print(f"{index:4d}  {run['id']}  {when}  {run['commit'][:12]:18s} {run['machine']}  {run['note']}")
+
+    elif args.command == "compare":
+        runs = load_history(args.history)
+        baseline = find_run(runs, args.baseline)
+        candidate = find_run(runs, args.candidate)
+        if baseline["machine"] != candidate["machine"]:
+            print("warning: runs were recorded on different machines")
+        print(f"{baseline['id']} ({baseline['commit'][:12]}) -> {candidate['id']} ({candidate['commit'][:12]})")
+        regressions = 0
+        for name, ratio, low, high, verdict in compare_runs(baseline, candidate, args.threshold):
+            print(f"  {name:30s} x{ratio:6.3f}  95% CI [{low:6.3f}, {high:6.3f}]  {verdict}")
+            regressions += verdict == "REGRESSION"
+        raise SystemExit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import math
+import pygame
+from src.constants import WIDTH, HEIGHT
+
+class AutoPlayer:
+    """Input source that plays the game by predicting where the footbag comes down.
+
+    The footbag path is solved in closed form, one ballistic segment at a time, with the
+    ceiling and side-wall bounces from Footbag.update applied between segments. The ankle
+    is parked under the landing point with the foot centre slightly outside the footbag, so
+    the bounce drifts back toward the middle, and is lifted right before impact to give
+    the kick some speed.
+    """
+
+    def __init__(self, game, intercept_height=200, kick_frames=3, kick_lift=15, steer=2, leg=None):
+        self.game = game
+        self.leg = leg if leg is not None else game.leg  # The leg this bot plays
+        self.intercept_height = intercept_height  # Height of the foot above the ground when kicking
+        self.kick_frames = kick_frames  # Frames before impact at which the kick starts
+        self.kick_lift = kick_lift  # Upward ankle motion per frame during the kick
+        self.steer = steer  # Horizontal offset of the foot centre from the footbag
+        self.pos = pygame.Vector2(self.leg.ankle_pos)
+        self.rel = pygame.Vector2(0, 0)
+
+    def predict(self, footbag, target_y):
+        """Return (frames, x) at which the footbag centre falls through `target_y`.
+
+        Returns None if it never gets there (e.g. it is already below).
+        """
+        x, y = footbag.position
+        vx, vy = footbag.velocity
+        g = footbag.gravity
+        r = footbag.base_radius
+        frames = 0.0
+
+        # After n frames: y(n) = y + n*vy + g*n*(n+1)/2. Bounce off the ceiling first if the
+        # footbag rises high enough to reach it.
+        if vy < 0:
+            n = self._solve(g, vy, y - r, rising=True)
+            if n is not None:
+                n = math.ceil(n)
+                x, vx = self._advance_x(x, vx, n, r)
+                vy = -0.7 * (vy + g * n)
+                y = r
+                frames += n
+        n = self._solve(g, vy, y - target_y, rising=False)
+        if n is None:
+            return None
+        x, vx = self._advance_x(x, vx, n, r)
+        return frames + n, x
+
+    @staticmethod
+    def _solve(g, vy, height, rising):
+        """Smallest n >= 0 with n*vy + g*n*(n+1)/2 == -height, or None."""
+        # g/2 n^2 + (vy + g/2) n + height = 0
+        b = vy + g / 2
+        disc = b * b - 2 * g * height
+        if disc < 0:
+            return None
+        root = math.sqrt(disc)
+        n = (-b - root) / g if rising else (-b + root) / g
+        return n if n >= 0 else None
+
+    @staticmethod
+    def _advance_x(x, vx, n, r):
+        """Move horizontally for n frames, reflecting off the side walls."""
+        remaining = n
+        while remaining > 0 and abs(vx) > 1e-6:
+            wall = WIDTH - r if vx > 0 else r
+            to_wall = (wall - x) / vx
+            if to_wall >= remaining:
+                return x + vx * remaining, vx
+            x = wall
+            vx *= -0.8
+            remaining -= to_wall
+        return x, vx
+
+    def get_pos(self):
+        leg = self.leg
+        ankle_y = HEIGHT - self.intercept_height
+
+        # Go for the footbag that comes down first
+        frames, land_x = None, None
+        for footbag in self.game.footbags:
+            # Centre of the footbag when its bottom reaches the top of the foot
+            contact_y = ankle_y - leg.foot_height / 2 - footbag.base_radius
+            prediction = self.predict(footbag, contact_y)
+            if prediction is None:
+                prediction = (0, footbag.position.x)
+            if frames is None or prediction[0] < frames:
+                frames, land_x = prediction
+
+        # Put the foot centre slightly outside the footbag so it is kicked back to the middle
+        foot_center_x = land_x + math.copysign(self.steer, land_x - leg.hip_pos.x)
+        half_foot = leg.foot_length / 2
+        if foot_center_x >= leg.hip_pos.x:
+            ankle_x = max(foot_center_x - half_foot, leg.hip_pos.x + 1)
+        else:
+            ankle_x = min(foot_center_x + half_foot, leg.hip_pos.x)
+
+        # Lift the foot into the footbag just before impact
+        if frames <= self.kick_frames:
+            ankle_y -= self.kick_lift
+
+        target = pygame.Vector2(ankle_x, ankle_y)
+        self.rel = target - self.pos
+        self.pos = target
+        return (target.x, target.y)
+
+    def get_velocity(self):
+        return pygame.Vector2(self.rel)
+
+    def poll(self):
+        pass
+
+    def presented(self):
+        pass
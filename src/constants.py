@@ -3,6 +3,12 @@ import pygame
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
 
+# Frames per second the game runs at
+FPS = 60
+
+# Internal render resolution as a fraction of the world size
+RENDER_SCALE = 1.0
+
 # Colors - Psychedelic palette
 COLORS = [
     (255, 0, 128),  # Hot pink
@@ -14,8 +20,9 @@ COLORS = [
 ]
 
 # Initialize pygame display
-def init_display():
-    """Initialize pygame display with the appropriate width and height."""
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+def init_display(render_scale=RENDER_SCALE, fullscreen=False):
+    """Initialize pygame display and return a Display rendering at `render_scale`."""
+    from src.display import Display
+    display = Display(render_scale, fullscreen=fullscreen)
     pygame.display.set_caption("Psychedelic Footbag")
-    return screen
+    return display
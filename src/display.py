@@ -0,0 +1,69 @@
+import pygame
+from src.constants import WIDTH, HEIGHT
+
+class Display:
+    """Renders the world into an internal surface and presents it scaled to the window.
+
+    The world is always WIDTH x HEIGHT units. The internal surface is that size times
+    `render_scale`, and draw code scales its coordinates by the surface width, so physics
+    never sees the resolution. present() letterboxes the internal surface into the window.
+    """
+
+    def __init__(self, render_scale=1.0, window_size=(WIDTH, HEIGHT), fullscreen=False, smooth=True):
+        self.render_scale = render_scale
+        self.smooth = smooth
+        self.fullscreen = fullscreen
+        self.window_size = window_size
+        self.window = self._set_mode()
+        self.surface = pygame.Surface(
+            (max(1, round(WIDTH * render_scale)), max(1, round(HEIGHT * render_scale)))
+        ).convert()
+        self.viewport = self.window.get_rect()
+        self.update_viewport()
+
+    def _set_mode(self):
+        if self.fullscreen:
+            return pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        return pygame.display.set_mode(self.window_size, pygame.RESIZABLE)
+
+    def update_viewport(self):
+        """Fit the world into the window, keeping its aspect ratio."""
+        window_width, window_height = self.window.get_size()
+        scale = min(window_width / WIDTH, window_height / HEIGHT)
+        width, height = max(1, round(WIDTH * scale)), max(1, round(HEIGHT * scale))
+        self.viewport = pygame.Rect((window_width - width) // 2, (window_height - height) // 2, width, height)
+        self.window.fill((0, 0, 0))  # Clear the letterbox bars
+
+    def toggle_fullscreen(self):
+        self.fullscreen = not self.fullscreen
+        self.window = self._set_mode()
+        self.update_viewport()
+
+    def handle_event(self, event):
+        if event.type == pygame.VIDEORESIZE:
+            self.window = pygame.display.get_surface()
+            self.update_viewport()
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F11:
+            self.toggle_fullscreen()
+
+    @property
+    def world_per_pixel(self):
+        """World units covered by one window pixel."""
+        return WIDTH / self.viewport.width
+
+    def to_world(self, window_pos):
+        """Map a window position (e.g. the mouse) back to world coordinates."""
+        scale = self.world_per_pixel
+        return ((window_pos[0] - self.viewport.x) * scale, (window_pos[1] - self.viewport.y) * scale)
+
+    def present(self):
+        """Scale the internal surface into the window and flip."""
+        if self.viewport.size == self.surface.get_size():
+            self.window.blit(self.surface, self.viewport)
+        else:
+            target = self.window.subsurface(self.viewport)
+            if self.smooth:
+                pygame.transform.smoothscale(self.surface, self.viewport.size, target)
+            else:
+                pygame.transform.scale(self.surface, self.viewport.size, target)
+        pygame.display.flip()
@@ -1,16 +1,31 @@
 import pygame
 import math
-import random
+import numpy as np
 from src.constants import WIDTH, HEIGHT, COLORS
 
+class FootbagGeometry:
+    """Bounds of a blob this frame: its bounding box and a bounding circle around the centre.
+
+    Built once per frame by Footbag.update_geometry() and read by collision, the reach
+    test and the ground check.
+    """
+
+    def __init__(self, footbag):
+        xs, ys = zip(*footbag.points)
+        self.left = min(xs)
+        self.top = min(ys)
+        self.right = max(xs)
+        self.bottom = max(ys)
+        self.rect = pygame.Rect(self.left, self.top, self.right - self.left, self.bottom - self.top)
+        self.radius = math.sqrt(max(map(footbag.position.distance_squared_to, footbag.points)))
+
 class Footbag:
-    def __init__(self):
+    def __init__(self, position=None, rng=None):
         self.base_radius = 15
-        self.position = pygame.Vector2(WIDTH // 2, HEIGHT // 2)
-        self.velocity = pygame.Vector2(random.uniform(-2, 2), -6)  # Reduced initial velocity
+        self.position = pygame.Vector2()
+        self.velocity = pygame.Vector2()
         self.gravity = 0.2  # Slightly reduced gravity
-        self.color_index = 0
-        self.color_timer = 0
+        self.rng = rng if rng is not None else np.random.default_rng()  # Draws the launch velocity
         
         # Blob physics parameters
         self.num_points = 12  # Number of points around the blob
@@ -20,23 +35,44 @@ class Footbag:
         self.target_points = []  # Where points want to return to
         self.point_velocities = []  # Velocity of each point
         
-        # Initialize blob points in a circle
+        # Blob points sit in a circle around the centre
         for i in range(self.num_points):
             angle = 2 * math.pi * i / self.num_points
-            point = pygame.Vector2(
-                self.position.x + math.cos(angle) * self.base_radius,
-                self.position.y + math.sin(angle) * self.base_radius
-            )
-            self.points.append(point)
+            self.points.append(pygame.Vector2())
             self.target_points.append(pygame.Vector2(
                 math.cos(angle) * self.base_radius,
                 math.sin(angle) * self.base_radius
             ))
             self.point_velocities.append(pygame.Vector2(0, 0))
         
+        # Objects notified of wall hits through on_wall_hit(footbag, normal)
+        self.listeners = []
+        
+        self.reset(position)
+        
+    def reset(self, position=None):
+        """Put the footbag back at its start, reusing its vectors."""
+        self.position.update(position if position is not None else (WIDTH // 2, HEIGHT // 2))
+        self.velocity.update(self.rng.uniform(-2, 2), -6)  # Reduced initial velocity
+        self.color_index = 0
+        self.color_timer = 0
+        
+        # Initialize blob points in a circle
+        for point, target, point_velocity in zip(self.points, self.target_points, self.point_velocities):
+            point.update(self.position + target)
+            point_velocity.update(0, 0)
+        
         # Track collisions for deformation effects
         self.last_collision = None
         self.collision_timer = 0
+        self.wall_hits = 0  # Wall and ceiling bounces so far
+        self.kicks = 0  # Foot and calf hits so far
+        
+        self.update_geometry()
+        
+    def update_geometry(self):
+        """Rebuild the geometry record; needed whenever the points are moved."""
+        self.geometry = FootbagGeometry(self)
         
     def update(self):
         # Apply gravity
@@ -67,6 +103,9 @@ class Footbag:
         if collision_normal:
             self.last_collision = collision_normal
             self.collision_timer = 10  # Duration of deformation effect
+            self.wall_hits += 1
+            for listener in self.listeners:
+                listener.on_wall_hit(self, collision_normal)
         elif self.collision_timer > 0:
             self.collision_timer -= 1
         else:
@@ -111,29 +150,28 @@ class Footbag:
         if self.color_timer > 10:
             self.color_timer = 0
             self.color_index = (self.color_index + 1) % len(COLORS)
+            
+        self.update_geometry()
     
     def draw(self, surface):
+        # World to surface scale (the surface may be rendered below world resolution)
+        scale = surface.get_width() / WIDTH
+        
         # Draw the flexible blob
         if len(self.points) >= 3:
-            pygame.draw.polygon(surface, COLORS[self.color_index], [(p.x, p.y) for p in self.points])
+            pygame.draw.polygon(surface, COLORS[self.color_index], [(p.x * scale, p.y * scale) for p in self.points])
             
             # Draw highlight
             glow_color = (min(COLORS[self.color_index][0] + 50, 255), 
                         min(COLORS[self.color_index][1] + 50, 255), 
                         min(COLORS[self.color_index][2] + 50, 255))
-            pygame.draw.circle(surface, glow_color, (int(self.position.x), int(self.position.y)), int(self.base_radius * 0.5))
+            pygame.draw.circle(surface, glow_color, (int(self.position.x * scale), int(self.position.y * scale)),
+                               max(1, int(self.base_radius * 0.5 * scale)))
             
     def check_ground_collision(self):
         # Check if any point of the blob is below the ground
-        for point in self.points:
-            if point.y > HEIGHT:
-                return True
-        return False
+        return self.geometry.bottom > HEIGHT
     
     def get_collision_rect(self):
-        # Get bounding rectangle for collision detection
-        min_x = min(point.x for point in self.points)
-        min_y = min(point.y for point in self.points)
-        max_x = max(point.x for point in self.points)
-        max_y = max(point.y for point in self.points)
-        return pygame.Rect(min_x, min_y, max_x - min_x, max_y - min_y)
+        # Bounding rectangle for collision detection
+        return self.geometry.rect
@@ -1,36 +1,152 @@
 import pygame
 import sys
 import math
-from src.constants import WIDTH, HEIGHT, COLORS
+import time
+import numpy as np
+from src.constants import WIDTH, HEIGHT, COLORS, FPS
 from src.leg import Leg
 from src.footbag import Footbag
+from src.persistence import ScoreStore, SessionStats
+from src.input import MouseInput, PlayerInput
+from src.reach import ReachSleep
+from src.sprites import FootbagSprites
+from src.resources import Resources
+from src.ik import update_legs
 
 # Background color cycling
-bg_color_index = 0
-bg_color_timer = 0
 bg_color_change_speed = 0.5
 
+def spawn_seeds(seed, count):
+    """Split `seed` (an int, None or a SeedSequence) into `count` independent seeds.
+
+    Give each parallel worker its own seed, e.g. Game(seed=spawn_seeds(1, 8)[worker]),
+    and every worker gets a reproducible stream that does not overlap the others.
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(count)
+
 class Game:
-    def __init__(self):
-        self.leg = Leg()
-        self.footbag = Footbag()
-        self.running = True
-        self.score = 0
-        self.font = pygame.font.Font(None, 48)
+    def __init__(self, store=None, display=None, input_source=None, num_footbags=1, resources=None,
+                 num_players=1, seed=None, soft_body=None, trails=None):
+        # Independent random streams for the simulation and for effects, so particles never
+        # change the course of a game. `seed` may be an int or a spawned SeedSequence.
+        simulation_seed, effects_seed = spawn_seeds(seed, 2)
+        self.rng = np.random.default_rng(simulation_seed)
+        
+        # Fonts, cached surfaces and preallocated state that outlive a single game
+        self.resources = resources if resources is not None else Resources(rng=np.random.default_rng(effects_seed))
+        
+        # One leg per player, spread along the bottom of the screen
+        self.legs = [Leg((i + 1) * WIDTH // (num_players + 1), self.rng) for i in range(num_players)]
+        self.leg = self.legs[0]
+        self.footbags = [Footbag(self.start_position(i, num_footbags), self.rng) for i in range(num_footbags)]
+        self.footbag = self.footbags[0]
+        
+        # Optional SoftBodySolver keeping blob edge lengths and area, solved for all footbags at once
+        self.soft_body = soft_body
+        self.metrics = None  # GameMetrics timing the phases of run()
+        
+        # Optional MotionTrails the legs and footbags leave behind
+        self.trails = trails
+        
+        # Many footbags are drawn as cached sprites in one batched blit
+        self.footbag_sprites = FootbagSprites() if num_footbags > 1 else None
+        
+        # Skip collision checks while a footbag is out of a leg's reach (one per footbag and leg)
+        self.reach_sleeps = [ReachSleep(leg, footbag) for footbag in self.footbags for leg in self.legs]
+        
+        # Particle bursts on kicks and wall hits
+        self.particles = self.resources.particles
+        
+        # High scores and session statistics
+        self.store = store if store is not None else ScoreStore()
+        self.session = SessionStats(HEIGHT)
+        for leg in self.legs:
+            leg.listeners.append(self.particles)
+            leg.listeners.append(self.session)
+            # Other players' legs hold still until their inputs are set
+            leg.input = PlayerInput(leg.ankle_pos.x, leg.ankle_pos.y)
+        for footbag in self.footbags:
+            footbag.listeners.append(self.particles)
+            footbag.listeners.append(self.session)
+        # Objects whose observe(footbag) runs for every footbag each frame and whose
+        # reset() runs on restart
+        self.observers = [self.session]
+        
+        # Display the world is presented on (mouse positions are mapped through it)
+        self.display = display
+        
+        # Where the ankle target comes from (the mouse, or a bot for headless runs)
+        self.set_input(input_source if input_source is not None else MouseInput(self))
+        
+        # Background color cycling (kept across restarts)
+        self.bg_color_index = 0
+        self.bg_color_timer = 0
+        
+        self.font_scale = None
+        self.scale_fonts(1.0)
         
         # Title animation properties
-        self.title_font = pygame.font.Font(None, 64)  # Slightly smaller font size for better visibility
         self.title_text = "Psychedelic Footbag"
-        self.title_color_index = 0
-        self.title_color_timer = 0
         self.title_y_offset = 0
         self.title_wave_amplitude = 10  # Reduced amplitude for better legibility
         self.title_wave_frequency = 0.1
         self.title_wave_speed = 0.05
+        
+        self.restart_seconds = 0.0  # How long the last reset() took
+        self.reset()
+        
+    @staticmethod
+    def start_position(index, num_footbags):
+        """Starting position of a footbag; juggling mode spreads them across the arena."""
+        if num_footbags == 1:
+            return None
+        return ((index + 1) * WIDTH / (num_footbags + 1), HEIGHT // 2 - (index % 3) * 60)
+        
+    def reset(self):
+        """Restart the game in place, reusing every object and resource."""
+        start = time.perf_counter()
+        for leg in self.legs:
+            leg.reset()
+        for i, footbag in enumerate(self.footbags):
+            footbag.reset(self.start_position(i, len(self.footbags)))
+        for reach_sleep in self.reach_sleeps:
+            reach_sleep.reset()
+        self.particles.clear()
+        if self.trails is not None:
+            self.trails.clear()
+        for observer in self.observers:
+            observer.reset()
+        self.running = True
+        self.score = 0
+        self.title_color_index = 0
+        self.title_color_timer = 0
         self.title_wave_time = 0
+        self.restart_seconds = time.perf_counter() - start
+        
+    def scale_fonts(self, scale):
+        """Pick font sizes for a surface rendered at `scale` times world resolution."""
+        if scale == self.font_scale:
+            return
+        self.font_scale = scale
+        self.font_size = max(1, int(48 * scale))
+        self.small_font_size = max(1, int(32 * scale))
+        self.title_font_size = max(1, int(64 * scale))  # Slightly smaller font size for better visibility
+        self.font = self.resources.font(self.font_size)
+        self.small_font = self.resources.font(self.small_font_size)
+        self.title_font = self.resources.font(self.title_font_size)
+        
+    def set_input(self, input_source):
+        self.input = input_source
+        self.leg.input = input_source
         
     def handle_events(self):
+        # Mouse motion goes to the input source first
+        self.input.poll()
         for event in pygame.event.get():
+            if self.display is not None:
+                self.display.handle_event(event)
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
@@ -38,29 +154,46 @@ class Game:
                     self.running = False
                     
     def update(self):
-        # Get mouse position
-        mouse_pos = pygame.mouse.get_pos()
-        
-        # Update leg position
-        self.leg.update(mouse_pos)
+        # Each leg follows its own input (the mouse, in world coordinates, for the first)
+        if len(self.legs) > 1:
+            # Solve all legs in one batched call
+            update_legs(self.legs, [leg.input.get_pos() for leg in self.legs])
+        else:
+            self.leg.update(self.leg.input.get_pos())
         
-        # Check for collision between footbag and leg
-        if self.leg.check_footbag_collision(self.footbag):
-            self.score += 1
+        reach_sleeps = iter(self.reach_sleeps)
+        for footbag in self.footbags:
+            # Check for collision between footbag and legs; one kick per footbag and frame
+            kicked = False
+            for leg in self.legs:
+                if next(reach_sleeps).should_check() and not kicked and leg.check_footbag_collision(footbag):
+                    kicked = True
+            if kicked:
+                self.score += 1
+                
+            # Update footbag
+            footbag.update()
             
-        # Update footbag
-        self.footbag.update()
+        if self.soft_body is not None:
+            self.soft_body.solve(self.footbags)
+            
+        for footbag in self.footbags:
+            # Track session statistics
+            for observer in self.observers:
+                observer.observe(footbag)
+            
+            # Check if footbag hit ground
+            if footbag.check_ground_collision():
+                self.running = False
         
-        # Check if footbag hit ground
-        if self.footbag.check_ground_collision():
-            self.running = False
+        # Update particles
+        self.particles.update()
             
         # Update background color
-        global bg_color_timer, bg_color_index
-        bg_color_timer += bg_color_change_speed
-        if bg_color_timer >= 100:
-            bg_color_timer = 0
-            bg_color_index = (bg_color_index + 1) % len(COLORS)
+        self.bg_color_timer += bg_color_change_speed
+        if self.bg_color_timer >= 100:
+            self.bg_color_timer = 0
+            self.bg_color_index = (self.bg_color_index + 1) % len(COLORS)
             
         # Update title animation
         self.title_wave_time += self.title_wave_speed
@@ -70,48 +203,75 @@ class Game:
             self.title_color_index = (self.title_color_index + 1) % len(COLORS)
         
     def draw(self, screen):
+        # The screen may be rendered below world resolution
+        scale = screen.get_width() / WIDTH
+        screen_width, screen_height = screen.get_size()
+        self.scale_fonts(scale)
+        
         # Fill background with psychedelic color gradient
-        bg_color = COLORS[bg_color_index]
-        bg_color2 = COLORS[(bg_color_index + 1) % len(COLORS)]
-        for y in range(0, HEIGHT, 4):
+        bg_color = COLORS[self.bg_color_index]
+        bg_color2 = COLORS[(self.bg_color_index + 1) % len(COLORS)]
+        for y in range(0, screen_height, 4):
             # Interpolate between colors
-            t = y / HEIGHT
+            t = y / screen_height
             color = (
                 int(bg_color[0] * (1 - t) + bg_color2[0] * t),
                 int(bg_color[1] * (1 - t) + bg_color2[1] * t),
                 int(bg_color[2] * (1 - t) + bg_color2[2] * t)
             )
-            pygame.draw.rect(screen, color, (0, y, WIDTH, 4))
+            pygame.draw.rect(screen, color, (0, y, screen_width, 4))
             
         # Draw animated title
         self.draw_animated_title(screen)
             
+        # With prediction, the mouse leg is drawn where the mouse will be when the frame is shown
+        target = self.input.render_pos() if isinstance(self.input, MouseInput) else None
+        
+        # Trails: only this frame's objects go into the accumulation surface
+        if self.trails is not None:
+            self.draw_objects(self.trails.begin(screen), target)
+            self.trails.composite(screen)
+            
         # Draw objects
-        self.leg.draw(screen)
-        self.footbag.draw(screen)
+        self.draw_objects(screen, target)
+        self.particles.draw(screen)
         
         # Draw score
-        score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
-        screen.blit(score_text, (20, 20))
+        score_text = self.resources.text(self.font_size, f"Score: {self.score}", (255, 255, 255))
+        screen.blit(score_text, (20 * scale, 20 * scale))
+        
+    def draw_objects(self, surface, target=None):
+        """Draw the legs and footbags, the first leg posed for `target` if given."""
+        for leg in self.legs:
+            if target is not None and leg is self.leg:
+                leg.draw_at(surface, target)
+            else:
+                leg.draw(surface)
+        if self.footbag_sprites is not None:
+            self.footbag_sprites.draw(surface, self.footbags)
+        else:
+            for footbag in self.footbags:
+                footbag.draw(surface)
         
     def draw_animated_title(self, screen):
         """Draw the animated title at the top of the screen."""
         # Get base color for the title
         title_color = COLORS[self.title_color_index]
+        scale = screen.get_width() / WIDTH
+        amplitude = self.title_wave_amplitude * scale
+        glow = max(1, round(2 * scale))
         
         # Set up position variables
         title_width = self.title_font.size(self.title_text)[0]
-        title_start_x = (WIDTH - title_width) // 2
+        title_start_x = (screen.get_width() - title_width) // 2
         
         # Fixed vertical position near the top of the screen (not too high)
-        base_y = 60
+        base_y = 60 * scale
         
         # Create a background for better visibility
-        bg_rect = pygame.Rect(0, 20, WIDTH, 100)
+        bg_rect = pygame.Rect(0, round(20 * scale), screen.get_width(), round(100 * scale))
         bg_color = (0, 0, 0, 70)  # Semi-transparent black
-        bg_surf = pygame.Surface((bg_rect.width, bg_rect.height), pygame.SRCALPHA)
-        bg_surf.fill(bg_color)
-        screen.blit(bg_surf, bg_rect)
+        screen.blit(self.resources.backdrop(bg_rect.size, bg_color), bg_rect)
         
         # Draw the glow effect first
         glow_color = (title_color[0], title_color[1], title_color[2], 60)
@@ -124,11 +284,11 @@ class Game:
                 continue
                 
             # Calculate wave offset for this character
-            wave_offset = math.sin(self.title_wave_time + i * self.title_wave_frequency) * self.title_wave_amplitude
+            wave_offset = math.sin(self.title_wave_time + i * self.title_wave_frequency) * amplitude
             
             # Draw glow (multiple offsets for bloom effect)
-            char_surf = self.title_font.render(char, True, glow_color)
-            for offset in [(2, 2), (-2, -2), (2, -2), (-2, 2)]:
+            char_surf = self.resources.text(self.title_font_size, char, glow_color)
+            for offset in [(glow, glow), (-glow, -glow), (glow, -glow), (-glow, glow)]:
                 screen.blit(char_surf, (x_pos + offset[0], base_y + wave_offset + offset[1]))
                 
             x_pos += self.title_font.size(char)[0]
@@ -137,7 +297,7 @@ class Game:
         x_pos = title_start_x
         for i, char in enumerate(self.title_text):
             # Calculate wave offset
-            wave_offset = math.sin(self.title_wave_time + i * self.title_wave_frequency) * self.title_wave_amplitude
+            wave_offset = math.sin(self.title_wave_time + i * self.title_wave_frequency) * amplitude
             
             # Create bright color for this character
             bright_color = (min(255, title_color[0] + 50), 
@@ -148,50 +308,102 @@ class Game:
             color = bright_color if i % 2 == 0 else title_color
             
             # Render and position the character
-            char_surf = self.title_font.render(char, True, color)
+            char_surf = self.resources.text(self.title_font_size, char, color)
             screen.blit(char_surf, (x_pos, base_y + wave_offset))
             
             # Move to next character position
             x_pos += self.title_font.size(char)[0]
         
-    def game_over_screen(self, screen):
-        # Display game over message
-        game_over_text = self.font.render("GAME OVER", True, (255, 255, 255))
-        final_score_text = self.font.render(f"Final Score: {self.score}", True, (255, 255, 255))
-        restart_text = self.font.render("Press SPACE to restart", True, (255, 255, 255))
-        
-        screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, HEIGHT // 2 - 60))
-        screen.blit(final_score_text, (WIDTH // 2 - final_score_text.get_width() // 2, HEIGHT // 2))
-        screen.blit(restart_text, (WIDTH // 2 - restart_text.get_width() // 2, HEIGHT // 2 + 60))
+    def game_over_screen(self, display):
+        # Save the session in the background
+        self.store.submit(self.session.finish(self.score))
         
-        pygame.display.flip()
+        # Draw the game over message over the last frame
+        self.draw_game_over(display.surface)
+        display.present()
+        self.input.presented()
         
         # Wait for restart or quit
         waiting = True
         while waiting:
             for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+                display.handle_event(event)
+                if event.type == pygame.VIDEORESIZE or (event.type == pygame.KEYDOWN and event.key == pygame.K_F11):
+                    display.present()
+                elif event.type == pygame.QUIT:
+                    self.store.close()
                     pygame.quit()
                     sys.exit()
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
-                        # Restart game
-                        self.__init__()
+                        # Restart game in place
+                        self.reset()
                         waiting = False
                     elif event.key == pygame.K_ESCAPE:
+                        self.store.close()
                         pygame.quit()
                         sys.exit()
         
-    def run(self, screen):
-        clock = pygame.time.Clock()
+    def draw_game_over(self, screen):
+        scale = screen.get_width() / WIDTH
+        center_x, center_y = screen.get_width() // 2, screen.get_height() // 2
+        self.scale_fonts(scale)
+        
+        # Display game over message
+        game_over_text = self.resources.text(self.font_size, "GAME OVER", (255, 255, 255))
+        final_score_text = self.resources.text(self.font_size, f"Final Score: {self.score}", (255, 255, 255))
+        restart_text = self.resources.text(self.font_size, "Press SPACE to restart", (255, 255, 255))
+        
+        screen.blit(game_over_text, (center_x - game_over_text.get_width() // 2, center_y - 60 * scale))
+        screen.blit(final_score_text, (center_x - final_score_text.get_width() // 2, center_y))
+        screen.blit(restart_text, (center_x - restart_text.get_width() // 2, center_y + 60 * scale))
+        
+        # Display leaderboard
+        for i, (score, finished_at) in enumerate(self.store.top()):
+            entry_text = self.resources.text(self.small_font_size, f"{i + 1}. {score}", (255, 255, 255))
+            screen.blit(entry_text, (center_x - entry_text.get_width() // 2, center_y + (110 + i * 28) * scale))
+        
+    def timed_frame(self, display):
+        """update, draw and present one frame, timing each phase into self.metrics."""
+        metrics = self.metrics
+        start = time.perf_counter()
+        self.update()
+        updated = time.perf_counter()
+        self.draw(display.surface)
+        drawn = time.perf_counter()
+        display.present()
+        presented = time.perf_counter()
+        metrics.step()
+        metrics.observe("update", updated - start)
+        metrics.observe("draw", drawn - updated)
+        metrics.observe("present", presented - drawn)
+
+    def wait_for_next_frame(self, deadline):
+        """Keep sampling input until `deadline` instead of sleeping through the frame."""
+        while True:
+            self.input.poll()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 0.001))
+        
+    def run(self, display):
+        self.display = display
         
         # Main game loop
+        deadline = time.perf_counter()
         while self.running:
             self.handle_events()
-            self.update()
-            self.draw(screen)
-            pygame.display.flip()
-            clock.tick(60)
+            if self.metrics is None:
+                self.update()
+                self.draw(display.surface)
+                display.present()
+            else:
+                self.timed_frame(display)
+            self.input.presented()
+            # Run late frames right away rather than catching up
+            deadline = max(deadline + 1 / FPS, time.perf_counter())
+            self.wait_for_next_frame(deadline)
             
         # Game over
-        self.game_over_screen(screen)
+        self.game_over_screen(display)
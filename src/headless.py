@@ -0,0 +1,215 @@
+import argparse
+import concurrent.futures
+import os
+import resource
+import time
+
+# Headless runs never open a real window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from src.constants import WIDTH, HEIGHT
+from src.game import Game, spawn_seeds
+from src.input import MouseInput
+from src.bot import AutoPlayer
+from src.persistence import ScoreStore
+from src.leaderboard import RemoteScoreStore, parse_address
+from src.alloctrace import AllocationTracer
+from src.telemetry import TelemetryRecorder
+from src.softbody import SoftBodySolver
+from src.metrics import serve_metrics
+from src.stats import GameplayStats
+
+# Input sources selectable for headless runs
+INPUT_SOURCES = {
+    "bot": AutoPlayer,
+    "mouse": MouseInput,
+}
+
+def create_game(input_name="bot", store=None, num_footbags=1, seed=None, soft_body=None, num_players=1):
+    """Create a Game driven by the named input source, without a window.
+
+    With several players, the first leg follows the named input source and every
+    other leg is played by its own bot.
+    """
+    if not pygame.get_init():
+        pygame.init()
+    game = Game(store if store is not None else ScoreStore(":memory:"), num_footbags=num_footbags, seed=seed,
+                soft_body=soft_body, num_players=num_players)
+    game.set_input(INPUT_SOURCES[input_name](game))
+    for leg in game.legs[1:]:
+        leg.input = AutoPlayer(game, leg=leg)
+    return game
+
+def run_headless(frames, input_name="bot", draw=False, report_every=0, trace_alloc=False, num_footbags=1,
+                 store=None, telemetry_dir=None, telemetry_format="npy", seed=None, soft_body_iterations=0,
+                 num_players=1, metrics_address=None, stats=False):
+    """Run `frames` game frames as fast as possible, restarting after every game over.
+
+    Returns a dict with the number of games, their scores and the achieved frame rate.
+    With `trace_alloc`, update and draw are traced and the report is included. With
+    `telemetry_dir`, every frame is streamed there by a TelemetryRecorder. With
+    `soft_body_iterations`, blobs are solved by a SoftBodySolver. With `metrics_address`
+    ("host:port"), Prometheus metrics of the loop are served there while it runs. With
+    `stats`, the result includes the GameplayStats of all games.
+    """
+    soft_body = SoftBodySolver(soft_body_iterations) if soft_body_iterations else None
+    game = create_game(input_name, store, num_footbags, seed, soft_body, num_players)
+    tracer = AllocationTracer(game) if trace_alloc else None
+    if tracer is not None:
+        tracer.install()
+    recorder = TelemetryRecorder(game, telemetry_dir, format=telemetry_format) if telemetry_dir else None
+    surface = pygame.Surface((WIDTH, HEIGHT)) if draw else None
+    gameplay_stats = GameplayStats() if stats else None
+    if gameplay_stats is not None:
+        gameplay_stats.attach(game)
+    metrics = serve_metrics(game, metrics_address, ("update", "telemetry", "draw")) if metrics_address else None
+    scores = []
+    restart_seconds = []
+    start = time.perf_counter()
+
+    for frame in range(1, frames + 1):
+        if metrics is None:
+            game.update()
+            if recorder is not None:
+                recorder.record()
+            if surface is not None:
+                game.draw(surface)
+        else:
+            timed_frame(game, metrics, recorder, surface)
+        if not game.running:
+            scores.append(game.score)
+            game.store.submit(game.session.finish(game.score))
+            game.reset()
+            restart_seconds.append(game.restart_seconds)
+        if report_every and frame % report_every == 0:
+            elapsed = time.perf_counter() - start
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            print(f"frame {frame}: {frame / elapsed:.0f} fps, {len(scores)} games, "
+                  f"score {game.score}, max rss {max_rss} KiB")
+
+    if recorder is not None:
+        recorder.close()
+    elapsed = time.perf_counter() - start
+    game.store.close()
+    if tracer is not None:
+        alloc_report = tracer.report()
+        tracer.uninstall()
+    else:
+        alloc_report = None
+    checks_run = sum(reach_sleep.checks_run for reach_sleep in game.reach_sleeps)
+    checks_skipped = sum(reach_sleep.checks_skipped for reach_sleep in game.reach_sleeps)
+    return {
+        "frames": frames,
+        "seconds": elapsed,
+        "fps": frames / elapsed,
+        "games": len(scores),
+        "scores": scores,
+        "current_score": game.score,
+        "max_restart_seconds": max(restart_seconds, default=0.0),
+        "collision_checks_run": checks_run,
+        "collision_checks_skipped": checks_skipped,
+        "alloc_report": alloc_report,
+        "stats": gameplay_stats,
+    }
+
+def timed_frame(game, metrics, recorder, surface):
+    """The body of the headless loop, with every phase timed into `metrics`."""
+    start = time.perf_counter()
+    game.update()
+    metrics.step()
+    metrics.observe("update", time.perf_counter() - start)
+    if recorder is not None:
+        start = time.perf_counter()
+        recorder.record()
+        metrics.observe("telemetry", time.perf_counter() - start)
+    if surface is not None:
+        start = time.perf_counter()
+        game.draw(surface)
+        metrics.observe("draw", time.perf_counter() - start)
+
+def _run_worker(frames, options, leaderboard):
+    store = RemoteScoreStore(*parse_address(leaderboard)) if leaderboard else None
+    return run_headless(frames, store=store, **options)
+
+def run_parallel(workers, frames, seed=None, leaderboard=None, **options):
+    """Run `workers` independent headless games in parallel processes.
+
+    Every worker gets its own stream spawned from `seed`, so the whole sweep is
+    reproducible. Returns the per-worker results in worker order. Worker i serves its
+    metrics on the port of `metrics_address` plus i.
+    """
+    telemetry_dir = options.pop("telemetry_dir", None)
+    metrics_address = options.pop("metrics_address", None)
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        futures = []
+        for worker, worker_seed in enumerate(spawn_seeds(seed, workers)):
+            worker_options = dict(options, seed=worker_seed)
+            if telemetry_dir:
+                worker_options["telemetry_dir"] = os.path.join(telemetry_dir, f"worker-{worker}")
+            if metrics_address:
+                host, port = parse_address(metrics_address)
+                worker_options["metrics_address"] = f"{host}:{port + worker}"
+            futures.append(executor.submit(_run_worker, frames, worker_options, leaderboard))
+        return [future.result() for future in futures]
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Psychedelic Footbag without a window")
+    parser.add_argument("--frames", type=int, default=10_000, help="number of frames to simulate")
+    parser.add_argument("--input", choices=sorted(INPUT_SOURCES), default="bot", help="input source")
+    parser.add_argument("--footbags", type=int, default=1, help="number of footbags (juggling mode)")
+    parser.add_argument("--players", type=int, default=1, help="number of legs, all but the first played by bots")
+    parser.add_argument("--draw", action="store_true", help="also render every frame offscreen")
+    parser.add_argument("--seed", type=int, help="seed for the random number generator")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="run this many independent games in parallel, with seeds spawned from --seed")
+    parser.add_argument("--soft-body", type=int, default=0, metavar="ITERATIONS",
+                        help="keep blob edge lengths and area with this many solver iterations")
+    parser.add_argument("--report-every", type=int, default=0, help="print progress every N frames")
+    parser.add_argument("--trace-alloc", action="store_true",
+                        help="trace allocations and GC pauses per frame (slow)")
+    parser.add_argument("--telemetry", metavar="DIR", help="stream every frame into chunked columnar files")
+    parser.add_argument("--telemetry-format", choices=["npy", "parquet"], default="npy",
+                        help="telemetry file format (parquet needs pyarrow)")
+    parser.add_argument("--leaderboard", metavar="HOST:PORT",
+                        help="submit finished games to a leaderboard service")
+    parser.add_argument("--stats", action="store_true",
+                        help="report kick speed, bounce height, airtime and hit statistics (merged over workers)")
+    parser.add_argument("--metrics", metavar="HOST:PORT",
+                        help="serve Prometheus metrics while running (workers use consecutive ports)")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        results = run_parallel(args.workers, args.frames, args.seed, args.leaderboard, input_name=args.input,
+                               draw=args.draw, num_footbags=args.footbags, telemetry_dir=args.telemetry,
+                               telemetry_format=args.telemetry_format, soft_body_iterations=args.soft_body,
+                               num_players=args.players, metrics_address=args.metrics, stats=args.stats)
+        for worker, result in enumerate(results):
+            print(f"worker {worker}: {result['fps']:.0f} fps, {result['games']} games, "
+                  f"best score {max(result['scores'], default=0)}, current score {result['current_score']}")
+        if args.stats:
+            merged = results[0]["stats"]
+            for result in results[1:]:
+                merged.merge(result["stats"])
+            print(merged.report())
+        return
+
+    store = RemoteScoreStore(*parse_address(args.leaderboard)) if args.leaderboard else None
+    result = run_headless(args.frames, args.input, args.draw, args.report_every, args.trace_alloc, args.footbags,
+                          store, args.telemetry, args.telemetry_format, args.seed, args.soft_body, args.players,
+                          args.metrics, args.stats)
+    scores = result["scores"]
+    print(f"{result['frames']} frames in {result['seconds']:.2f}s ({result['fps']:.0f} fps)")
+    print(f"{result['games']} games finished, best score {max(scores, default=0)}, "
+          f"current score {result['current_score']}")
+    print(f"slowest restart: {result['max_restart_seconds'] * 1e3:.3f} ms")
+    print(f"collision checks: {result['collision_checks_run']} run, "
+          f"{result['collision_checks_skipped']} skipped")
+    if result["alloc_report"] is not None:
+        print(result["alloc_report"])
+    if result["stats"] is not None:
+        print(result["stats"].report())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import time
+import numpy as np
+from src.constants import WIDTH, HEIGHT
+
+def solve_legs(hips, targets, thigh_length, calf_length):
+    """Solve ankle and knee positions for many legs at once.
+
+    `hips` and `targets` are (legs, 2) arrays of hip positions and ankle targets.
+    Returns (ankles, knees) as (legs, 2) arrays. Follows Leg.update step for step,
+    including its quirks: the ankle target is kept above the ground and clamped to the
+    maximum extension, but the bend angle and the knee direction use the unclamped
+    distance; the cosine is clamped to +-0.99; the knee bends upward, which rotates
+    clockwise for ankles right of the hip; and an ankle on the hip puts the knee half
+    a thigh to the right.
+    """
+    hips = np.asarray(hips, dtype=np.float64)
+    targets = np.array(targets, dtype=np.float64)
+    np.minimum(targets[:, 1], HEIGHT - 20, out=targets[:, 1])
+
+    hip_to_ankle = targets - hips
+    distance = np.sqrt(np.einsum("ij,ij->i", hip_to_ankle, hip_to_ankle))
+    safe_distance = np.maximum(distance, 1e-300)
+    max_extension = thigh_length + calf_length - 40
+    ankles = hips + hip_to_ankle * np.minimum(max_extension / safe_distance, 1)[:, None]
+
+    # Direction divides the (possibly clamped) offset by the unclamped distance
+    direction = (ankles - hips) / safe_distance[:, None]
+    dx = direction[:, 0]
+    dy = direction[:, 1]
+
+    # Law of cosines for the angle between thigh and the hip-ankle line
+    a = thigh_length
+    b = safe_distance
+    c = calf_length
+    cos_turn = np.clip((a * a + b * b - c * c) / (2 * a * b), -0.99, 0.99)
+    # The knee bends upward: clockwise when the ankle is right of the hip
+    sin_turn = np.sqrt(1 - cos_turn * cos_turn)
+    sin_turn[dx > 0] *= -1
+    knees = np.empty_like(hips)
+    knees[:, 0] = hips[:, 0] + (dx * cos_turn - dy * sin_turn) * thigh_length
+    knees[:, 1] = hips[:, 1] + (dx * sin_turn + dy * cos_turn) * thigh_length
+
+    # Ankle (almost) on the hip
+    degenerate = distance < 0.0001
+    knees[degenerate] = hips[degenerate] + (a / 2, 0)
+    return ankles, knees
+
+def update_legs(legs, targets):
+    """Batched Leg.update for legs that share their dimensions."""
+    leg = legs[0]
+    hips = [tuple(leg.hip_pos) for leg in legs]
+    ankles, knees = solve_legs(hips, targets, leg.thigh_length, leg.calf_length)
+    for leg, ankle, knee in zip(legs, ankles.tolist(), knees.tolist()):
+        leg.ankle_pos.update(ankle)
+        leg.knee_pos.update(knee)
+        leg.update_geometry()
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the batched leg IK against Leg.update")
+    parser.add_argument("--legs", type=int, default=10_000, help="number of legs")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random targets")
+    args = parser.parse_args()
+
+    from src.leg import Leg
+    rng = np.random.default_rng(args.seed)
+    hips = np.column_stack((rng.uniform(0, WIDTH, args.legs), np.full(args.legs, HEIGHT - 270)))
+    # Targets near and far, including some right on the hip
+    targets = hips + rng.normal(0, 250, (args.legs, 2))
+    targets[::97] = hips[::97]
+
+    leg = Leg()
+    start = time.perf_counter()
+    ankles, knees = solve_legs(hips, targets, leg.thigh_length, leg.calf_length)
+    batched = time.perf_counter() - start
+
+    error = 0.0
+    start = time.perf_counter()
+    for hip, target, ankle, knee in zip(hips.tolist(), targets.tolist(), ankles, knees):
+        leg.hip_pos.update(hip)
+        leg.update(target)
+        error = max(error, abs(leg.ankle_pos.x - ankle[0]), abs(leg.ankle_pos.y - ankle[1]),
+                    abs(leg.knee_pos.x - knee[0]), abs(leg.knee_pos.y - knee[1]))
+    scalar = time.perf_counter() - start
+
+    print(f"{args.legs} legs: batched {batched * 1e3:.3f} ms ({args.legs / batched / 1e3:.0f} legs/ms), "
+          f"Leg.update loop {scalar * 1e3:.3f} ms")
+    print(f"max difference from Leg.update: {error:.2e}")
+    raise SystemExit(0 if error < 1e-6 else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import collections
+import math
+import time
+import pygame
+from src.constants import FPS
+from src.predict import LeadEstimate
+
+class MouseInput:
+    """Input source that reads the ankle target from the mouse.
+
+    Input sources provide get_pos() (the ankle target in world coordinates),
+    get_velocity() (its velocity in world units per frame), poll() (take in pending
+    input) and presented() (called once a frame is on screen).
+
+    poll() drains every pending MOUSEMOTION event, coalesces them into one timestamped
+    sample and keeps a short history of samples. Game.run keeps polling while it waits
+    for the next frame, so samples are timestamped to within about a millisecond, and
+    the velocity at the moment of a kick comes from the last `window` seconds of motion.
+
+    Input-to-photon latency is measured from the first motion sample that has not been
+    shown yet to the end of Display.present() for the frame that shows it.
+
+    With a MotionPredictor, render_pos() extrapolates the mouse to when the frame being
+    drawn will be on screen, and with `predict_ik` get_pos() does the same for the leg's
+    IK. How long frames take to reach the screen is learned from presented(). The
+    distance between the drawn ankle target and the first mouse sample after the frame
+    is shown is kept for both the raw and the predicted target, to show the gain.
+    """
+
+    def __init__(self, game, history=64, window=0.03, keep_latencies=600, predictor=None, predict_ik=False):
+        self.game = game
+        self.window = window
+        self.samples = collections.deque(maxlen=history)  # (seconds, x, y) in world coordinates
+        self.pending_since = None  # Time of the oldest sample not on screen yet
+        self.latencies = collections.deque(maxlen=keep_latencies)
+
+        self.predictor = predictor
+        self.predict_ik = predict_ik
+        self.ik_lead = LeadEstimate()  # From get_pos() to the frame on screen
+        self.render_lead = LeadEstimate()  # From render_pos() to the frame on screen
+        self.drawn = None  # (raw, predicted) ankle target of the frame being drawn
+        self.shown = None  # (time on screen, raw, predicted) waiting for the next sample
+        self.prediction_errors = collections.deque(maxlen=keep_latencies)  # (raw, predicted) distances
+
+    def to_world(self, screen_pos):
+        if self.game.display is not None:
+            return self.game.display.to_world(screen_pos)
+        return screen_pos
+
+    def poll(self, now=None):
+        """Drain pending mouse motion into a single sample."""
+        events = pygame.event.get(pygame.MOUSEMOTION)
+        if events:
+            self.add_sample(events[-1].pos, time.perf_counter() if now is None else now)
+
+    def add_sample(self, screen_pos, now):
+        x, y = self.to_world(screen_pos)
+        self.samples.append((now, x, y))
+        if self.pending_since is None:
+            self.pending_since = now
+        if self.predictor is not None:
+            self.predictor.update(now, x, y)
+            self.check_prediction(now, x, y)
+
+    def check_prediction(self, now, x, y):
+        """Compare the last shown frame with the first sample taken after it was shown."""
+        if self.shown is None:
+            return
+        shown_at, (raw_x, raw_y), (predicted_x, predicted_y) = self.shown
+        self.shown = None
+        # A sample long after the frame says nothing about where the mouse was then
+        if now - shown_at < 0.005:
+            self.prediction_errors.append(
+                (math.hypot(raw_x - x, raw_y - y), math.hypot(predicted_x - x, predicted_y - y))
+            )
+
+    def get_pos(self):
+        # Until the mouse has moved there is nothing to extrapolate from
+        if self.predictor is not None and self.predict_ik and self.samples:
+            now = time.perf_counter()
+            self.ik_lead.start(now)
+            return self.predictor.predict(now + self.ik_lead.seconds)
+        if self.samples:
+            _, x, y = self.samples[-1]
+            return (x, y)
+        return self.to_world(pygame.mouse.get_pos())
+
+    def get_velocity(self, now=None):
+        """Velocity over the last `window` seconds of motion, in world units per frame."""
+        samples = self.samples
+        now = time.perf_counter() if now is None else now
+        if len(samples) < 2 or now - samples[-1][0] > self.window:
+            return pygame.Vector2(0, 0)  # The mouse has stopped
+
+        # Oldest sample inside the window, or the one just before it
+        t1, x1, y1 = samples[-1]
+        for t0, x0, y0 in reversed(samples):
+            if t1 - t0 >= self.window:
+                break
+        if t0 == t1:
+            return pygame.Vector2(0, 0)
+        scale = 1 / (FPS * (t1 - t0))
+        return pygame.Vector2((x1 - x0) * scale, (y1 - y0) * scale)
+
+    def render_pos(self, now=None):
+        """Where to draw the ankle target: the mouse extrapolated to display time, or None."""
+        if self.predictor is None or not self.samples:
+            return None
+        now = time.perf_counter() if now is None else now
+        self.render_lead.start(now)
+        predicted = self.predictor.predict(now + self.render_lead.seconds)
+        self.drawn = (self.samples[-1][1:], predicted)
+        return predicted
+
+    def presented(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if self.pending_since is not None:
+            self.latencies.append(now - self.pending_since)
+            self.pending_since = None
+        self.ik_lead.finish(now)
+        self.render_lead.finish(now)
+        if self.drawn is not None:
+            self.shown = (now,) + self.drawn
+            self.drawn = None
+
+    def latency_report(self):
+        if not self.latencies:
+            return "input-to-photon latency: no mouse motion shown"
+        latencies = sorted(self.latencies)
+        mean = sum(latencies) / len(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        report = (f"input-to-photon latency over {len(latencies)} frames: mean {mean * 1e3:.2f} ms, "
+                  f"p95 {p95 * 1e3:.2f} ms, max {latencies[-1] * 1e3:.2f} ms")
+        if self.prediction_errors:
+            count = len(self.prediction_errors)
+            raw = sum(error[0] for error in self.prediction_errors) / count
+            predicted = sum(error[1] for error in self.prediction_errors) / count
+            report += (f"\ndrawn ankle target vs mouse at display time over {count} frames: "
+                       f"raw {raw:.1f}, predicted {predicted:.1f} world units "
+                       f"(frames reach the screen {self.render_lead.seconds * 1e3:.1f} ms after drawing)")
+        return report
+
+class PlayerInput:
+    """Input source holding an input set from outside, e.g. one received over the network.
+
+    An input is the tuple (x, y, vx, vy): the ankle target and its velocity per frame.
+    """
+
+    def __init__(self, x=0.0, y=0.0, vx=0.0, vy=0.0):
+        self.input = (x, y, vx, vy)
+
+    def set(self, value):
+        self.input = value
+
+    def get_pos(self):
+        return self.input[0], self.input[1]
+
+    def get_velocity(self):
+        return pygame.Vector2(self.input[2], self.input[3])
+
+    def poll(self):
+        pass
+
+    def presented(self):
+        pass
+
+class ScriptedInput:
+    """Input source replaying a precomputed ankle path, one point per frame.
+
+    `path` is a sequence of (x, y) world positions; past its end the last point is
+    held. The velocity is the step from the previous frame's point.
+    """
+
+    def __init__(self, path):
+        self.path = [tuple(point) for point in path]
+        self.reset()
+
+    def reset(self):
+        """Replay the path from its start."""
+        self.frame = 0
+        self.last = self.path[0]
+        self.rel = (0.0, 0.0)
+
+    def get_pos(self):
+        pos = self.path[min(self.frame, len(self.path) - 1)]
+        self.rel = (pos[0] - self.last[0], pos[1] - self.last[1])
+        self.last = pos
+        self.frame += 1
+        return pos
+
+    def get_velocity(self):
+        return pygame.Vector2(self.rel)
+
+    def poll(self):
+        pass
+
+    def presented(self):
+        pass
@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import atexit
+import bisect
+import concurrent.futures
+import json
+import logging
+import math
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from src.persistence import DEFAULT_DB_PATH, SCHEMA, INSERT_SESSION
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Fields a submitted session record must have, and their types
+RECORD_FIELDS = {"finished_at": float, "score": int, "duration": float, "bounces": int, "max_height": float,
+                 "mean_kick_speed": float, "max_kick_speed": float, "kick_speeds": str}
+
+logger = logging.getLogger(__name__)
+
+def coerce_field(field, value):
+    """Convert a submitted value to the type of its column, or raise ValueError.
+
+    Anything SQLite would store as NULL (None, NaN) is refused here rather than failing
+    the whole batch in the writer.
+    """
+    kind = RECORD_FIELDS[field]
+    if kind is str:
+        # Kick speeds may arrive as the list itself
+        if isinstance(value, list):
+            return json.dumps(value)
+        if isinstance(value, str):
+            return value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        if kind is float:
+            return float(value)
+        if value == int(value):
+            return int(value)
+    raise ValueError(f"{field} must be {'a whole number' if kind is int else kind.__name__}, got {value!r}")
+
+def parse_address(address):
+    """Split "host:port" (or just ":port") into (host, port)."""
+    host, _, port = address.rpartition(":")
+    return host or DEFAULT_HOST, int(port)
+
+class LeaderboardServer:
+    """Asyncio leaderboard service that many games can submit scores to at once.
+
+    Clients speak a line protocol over TCP, one request and one reply per line:
+
+        SUBMIT <session record as JSON>  ->  OK
+        TOP [n]                          ->  TOP <[[score, finished_at], ...] as JSON>
+
+    Submissions are acknowledged as soon as they are queued. A single writer task
+    drains the queue and inserts each batch with one executemany in one transaction, on
+    a dedicated thread so SQLite never blocks the event loop. The database runs in WAL
+    mode so readers never wait for the writer. TOP is answered from an in-memory top-N.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, top_n=100, batch_size=512, max_pending=65536):
+        self.path = path
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.connection = None
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="leaderboard-writer")
+        self.leaderboard = []  # (-score, finished_at), best first
+        self.queue = None
+        self.server = None
+        self.writer_task = None
+
+        # Counters
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0  # Records in batches that failed to write
+
+    def _open(self):
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        return self.connection.execute(
+            "SELECT score, finished_at FROM sessions ORDER BY score DESC LIMIT ?", (self.top_n,)
+        ).fetchall()
+
+    def _write(self, batch):
+        with self.connection:
+            self.connection.executemany(INSERT_SESSION, batch)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        loop = asyncio.get_running_loop()
+        # The connection lives on the writer thread
+        top = await loop.run_in_executor(self.executor, self._open)
+        self.leaderboard = [(-score, finished_at) for score, finished_at in top]
+        self.queue = asyncio.Queue(self.max_pending)
+        self.writer_task = asyncio.create_task(self._writer())
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """Stop accepting connections and flush every queued submission."""
+        self.server.close()
+        await self.server.wait_closed()
+        await self.queue.put(None)
+        await self.writer_task
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.connection.close)
+        self.executor.shutdown()
+
+    async def _writer(self):
+        loop = asyncio.get_running_loop()
+        running = True
+        while running:
+            # Wait for the first record, then take everything already queued
+            batch = [await self.queue.get()]
+            while batch[-1] is not None and len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            if batch[-1] is None:
+                batch.pop()
+                running = False
+            if batch:
+                try:
+                    await loop.run_in_executor(self.executor, self._write, batch)
+                except Exception:
+                    # Keep the writer alive for the submissions after this batch
+                    logger.exception("dropping a batch of %d records", len(batch))
+                    self.dropped += len(batch)
+                    continue
+                self.written += len(batch)
+                self.batches += 1
+
+    def submit(self, record):
+        """Validate a record and update the in-memory leaderboard. Returns the record to queue."""
+        record = {field: coerce_field(field, record[field]) for field in RECORD_FIELDS}
+        entry = (-int(record["score"]), record["finished_at"])
+        if len(self.leaderboard) < self.top_n or entry < self.leaderboard[-1]:
+            bisect.insort(self.leaderboard, entry)
+            del self.leaderboard[self.top_n:]
+        self.submitted += 1
+        return record
+
+    def top(self, n=None):
+        return [(-score, finished_at) for score, finished_at in self.leaderboard[:n or self.top_n]]
+
+    async def _handle(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                command, _, argument = line.decode().strip().partition(" ")
+                try:
+                    if command == "SUBMIT":
+                        record = self.submit(json.loads(argument))
+                        # Waits here only if the writer has fallen max_pending records behind
+                        await self.queue.put(record)
+                        reply = "OK"
+                    elif command == "TOP":
+                        reply = "TOP " + json.dumps(self.top(int(argument) if argument else None))
+                    else:
+                        reply = f"ERROR unknown command {command!r}"
+                except (ValueError, KeyError, TypeError) as error:
+                    reply = f"ERROR {error}"
+                writer.write(reply.encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+class RemoteScoreStore:
+    """Score store that submits sessions to a leaderboard service.
+
+    Has the same interface as ScoreStore. submit() only queues the record; a background
+    thread sends it and refreshes the leaderboard from the service. Records that cannot
+    be delivered because the service is down are dropped.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, top_n=5, timeout=2.0):
+        self.address = (host, port)
+        self.top_n = top_n
+        self.timeout = timeout
+        self.leaderboard = []
+        self.dropped = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._sender, name="score-sender", daemon=True)
+        self._thread.start()
+        self._closed = False
+        atexit.register(self.close)
+
+    def submit(self, record):
+        self._queue.put(record)
+        self.leaderboard.append((record["score"], record["finished_at"]))
+        self.leaderboard.sort(key=lambda entry: entry[0], reverse=True)
+        del self.leaderboard[self.top_n:]
+
+    def top(self, n=None):
+        return self.leaderboard[:n or self.top_n]
+
+    def close(self):
+        """Send pending records and stop the sender thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _request(self, stream, line):
+        stream.write(line + "\n")
+        stream.flush()
+        return stream.readline().strip()
+
+    def _sender(self):
+        self._send([])  # Fetch the leaderboard
+        running = True
+        while running:
+            # Block for the first record, then take whatever else is queued
+            batch = [self._queue.get()]
+            while batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                running = False
+            if batch:
+                self._send(batch)
+
+    def _send(self, records):
+        try:
+            with socket.create_connection(self.address, self.timeout) as connection:
+                stream = connection.makefile("rw", encoding="utf-8")
+                for record in records:
+                    self._request(stream, "SUBMIT " + json.dumps(record))
+                reply = self._request(stream, f"TOP {self.top_n}")
+                if reply.startswith("TOP "):
+                    self.leaderboard = [tuple(entry) for entry in json.loads(reply[4:])]
+        except OSError:
+            self.dropped += len(records)
+
+async def load_test(host, port, clients=50, submissions=200):
+    """Submit from many concurrent connections. Returns (seconds, per-request latencies)."""
+    latencies = []
+
+    async def client(index):
+        reader, writer = await asyncio.open_connection(host, port)
+        for i in range(submissions):
+            score = (index * 7919 + i * 104729) % 1000
+            record = {"finished_at": time.time(), "score": score, "duration": score / 10, "bounces": score,
+                      "max_height": 300.0, "mean_kick_speed": 8.0, "max_kick_speed": 12.0, "kick_speeds": "[]"}
+            start = time.perf_counter()
+            writer.write(("SUBMIT " + json.dumps(record) + "\n").encode())
+            await writer.drain()
+            reply = await reader.readline()
+            latencies.append(time.perf_counter() - start)
+            if reply != b"OK\n":
+                raise RuntimeError(f"unexpected reply {reply!r}")
+        writer.close()
+        await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(clients)))
+    return time.perf_counter() - start, latencies
+
+async def serve(args):
+    path = args.db or DEFAULT_DB_PATH
+    server = LeaderboardServer(path, args.top_n, args.batch_size)
+    host, port = await server.start(args.host, args.port)
+    print(f"Leaderboard service on {host}:{port}, database {path}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+async def run_load_test(args):
+    server = None
+    host, port = args.host, args.port
+    if args.local:
+        # Start a throwaway service in this process, keeping fake scores out of the real database
+        server = LeaderboardServer(args.db or ":memory:", batch_size=args.batch_size)
+        host, port = await server.start(host, 0)
+    seconds, latencies = await load_test(host, port, args.clients, args.submissions)
+    latencies.sort()
+    count = len(latencies)
+    print(f"{count} submissions from {args.clients} clients in {seconds:.2f}s ({count / seconds:.0f}/s)")
+    print(f"latency p50 {latencies[count // 2] * 1e3:.2f} ms, p99 {latencies[int(count * 0.99)] * 1e3:.2f} ms, "
+          f"max {latencies[-1] * 1e3:.2f} ms")
+    if server is not None:
+        await server.close()
+        print(f"{server.written} records written in {server.batches} batches "
+              f"({server.written / max(server.batches, 1):.0f} per batch), {server.dropped} dropped")
+
+def main():
+    parser = argparse.ArgumentParser(description="Psychedelic Footbag leaderboard service")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on or connect to")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port")
+    parser.add_argument("--db", help="SQLite database file (default: the game's score database for serve, "
+                                     "an in-memory one for loadtest --local)")
+    parser.add_argument("--batch-size", type=int, default=512, help="most records written per transaction")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run the service")
+    serve_parser.add_argument("--top-n", type=int, default=100, help="leaderboard entries kept in memory")
+
+    load_parser = commands.add_parser("loadtest", help="submit many scores concurrently")
+    load_parser.add_argument("--clients", type=int, default=50, help="concurrent connections")
+    load_parser.add_argument("--submissions", type=int, default=200, help="submissions per connection")
+    load_parser.add_argument("--local", action="store_true", help="start a service in this process")
+
+    top_parser = commands.add_parser("top", help="print the leaderboard")
+    top_parser.add_argument("n", type=int, nargs="?", default=10, help="number of entries")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "loadtest":
+        asyncio.run(run_load_test(args))
+    elif args.command == "top":
+        with socket.create_connection((args.host, args.port)) as connection:
+            stream = connection.makefile("rw", encoding="utf-8")
+            stream.write(f"TOP {args.n}\n")
+            stream.flush()
+            reply = stream.readline()
+        for i, (score, finished_at) in enumerate(json.loads(reply[4:])):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(finished_at))
+            print(f"{i + 1:3d}. {score:6d}  {when}")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,64 @@
 import pygame
 import math
-import random
+import numpy as np
 from src.constants import WIDTH, HEIGHT, COLORS
 
+def limb_corners(start, end, width):
+    """Corners of a limb drawn as a rectangle of `width` from `start` to `end`."""
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    length = math.hypot(dx, dy)
+    # Unit direction of the limb, pointing right for a zero-length limb
+    cos_a, sin_a = (dx / length, dy / length) if length > 0 else (1.0, 0.0)
+    offset_x = width / 2 * sin_a
+    offset_y = width / 2 * cos_a
+    return (
+        (start[0] - offset_x, start[1] + offset_y),
+        (start[0] + offset_x, start[1] - offset_y),
+        (end[0] + offset_x, end[1] - offset_y),
+        (end[0] - offset_x, end[1] + offset_y),
+    )
+
+class LegGeometry:
+    """Where the parts of a leg are this frame, in world coordinates.
+
+    Built once per pose by Leg.update_geometry() and read by both collision and drawing.
+    """
+
+    def __init__(self, leg):
+        hip = tuple(leg.hip_pos)
+        knee = knee_x, knee_y = tuple(leg.knee_pos)
+        ankle = ankle_x, ankle_y = tuple(leg.ankle_pos)
+
+        # The foot points away from the hip
+        self.facing = 1 if ankle_x > hip[0] else -1
+        self.foot_end = (ankle_x + self.facing * leg.foot_length, ankle_y)
+        self.foot_center = ((ankle_x + self.foot_end[0]) / 2, ankle_y)
+        # Foot box, inflated slightly for better collision detection
+        self.foot_rect = pygame.Rect(
+            min(ankle_x, self.foot_end[0]),
+            ankle_y - leg.foot_height / 2,
+            leg.foot_length,
+            leg.foot_height,
+        )
+        self.foot_rect.inflate_ip(5, 5)
+
+        # Calf capsule: start, unit direction, length and radius (half width plus a buffer)
+        calf_x = ankle_x - knee_x
+        calf_y = ankle_y - knee_y
+        self.calf_length = math.hypot(calf_x, calf_y)
+        self.calf_start = knee
+        self.calf_direction = (calf_x / self.calf_length, calf_y / self.calf_length) if self.calf_length else (0, 0)
+        self.calf_radius = leg.calf_width / 2 + 5
+        self.calf_center = ((knee_x + ankle_x) / 2, (knee_y + ankle_y) / 2)
+
+        # Outlines of the limbs
+        self.thigh_corners = limb_corners(hip, knee, leg.thigh_width)
+        self.calf_corners = limb_corners(knee, ankle, leg.calf_width)
+        self.foot_corners = limb_corners(ankle, self.foot_end, leg.foot_height)
+
 class Leg:
-    def __init__(self):
+    def __init__(self, hip_x=WIDTH // 2, rng=None):
         # Leg dimensions
         self.foot_length = 80  # Longer foot
         self.foot_height = 15
@@ -14,16 +68,45 @@ class Leg:
         self.thigh_width = 25
         
         # Joint positions
-        self.ankle_pos = pygame.Vector2(WIDTH // 2, HEIGHT - 50)
-        self.knee_pos = pygame.Vector2(WIDTH // 2, HEIGHT - 150)
-        self.hip_pos = pygame.Vector2(WIDTH // 2, HEIGHT - 270)  # Centered at the bottom of the screen
+        self.ankle_pos = pygame.Vector2()
+        self.knee_pos = pygame.Vector2()
+        self.hip_pos = pygame.Vector2(hip_x, HEIGHT - 270)  # Centered at the bottom of the screen by default
         
         # Colors
         self.foot_color = COLORS[2]
         self.calf_color = COLORS[3]
         self.thigh_color = COLORS[4]
         
+        # Random generator for the spin given to kicked footbags
+        self.rng = rng if rng is not None else np.random.default_rng()
+        
+        # Input source used for kick velocity (the raw mouse when not set)
+        self.input = None
+        
+        # Objects notified of kicks through on_kick(leg, footbag, part, speed)
+        self.listeners = []
+        
+        # LegGeometry of the current pose
+        self.geometry = None
+        
+        self.reset()
+        
+    def reset(self):
+        """Put the leg back in its rest pose."""
+        self.ankle_pos.update(self.hip_pos.x, HEIGHT - 50)
+        self.knee_pos.update(self.hip_pos.x, HEIGHT - 150)
+        self.update_geometry()
+        
+    def update_geometry(self):
+        """Rebuild the geometry record; needed whenever the joints are moved."""
+        self.geometry = LegGeometry(self)
+        
     def update(self, mouse_pos):
+        self.solve(mouse_pos)
+        self.update_geometry()
+        
+    def solve(self, mouse_pos):
+        """Move the ankle toward `mouse_pos` and place the knee."""
         # Ankle directly follows mouse - this is what we want
         ankle_target = pygame.Vector2(mouse_pos[0], min(mouse_pos[1], HEIGHT - 20))
         
@@ -96,87 +179,48 @@ class Leg:
         self.knee_pos = self.hip_pos + pygame.Vector2(knee_dir_x, knee_dir_y) * self.thigh_length
         
     def draw(self, surface):
-        # Draw thigh
-        self.draw_limb(surface, self.hip_pos, self.knee_pos, self.thigh_width, self.thigh_color)
-        
-        # Draw calf
-        self.draw_limb(surface, self.knee_pos, self.ankle_pos, self.calf_width, self.calf_color)
-        
-        # Determine foot direction based on ankle position relative to hip
-        # We want the foot to point away from the hip
-        hip_to_ankle = self.ankle_pos - self.hip_pos
-        
-        # Check if ankle is to the right of hip
-        if self.ankle_pos.x > self.hip_pos.x:
-            # Ankle is to the right of hip, so foot points right
-            foot_end = (self.ankle_pos.x + self.foot_length, self.ankle_pos.y)
-        else:
-            # Ankle is to the left of hip, so foot points left
-            foot_end = (self.ankle_pos.x - self.foot_length, self.ankle_pos.y)
-        
-        # Draw foot
-        self.draw_limb(surface, self.ankle_pos, foot_end, self.foot_height, self.foot_color)
+        # World to surface scale (the surface may be rendered below world resolution)
+        scale = surface.get_width() / WIDTH
+        hip_pos = self.hip_pos * scale
+        knee_pos = self.knee_pos * scale
+        ankle_pos = self.ankle_pos * scale
+        geometry = self.geometry
+        
+        # Draw thigh, calf and foot
+        self.draw_limb(surface, geometry.thigh_corners, scale, self.thigh_color)
+        self.draw_limb(surface, geometry.calf_corners, scale, self.calf_color)
+        self.draw_limb(surface, geometry.foot_corners, scale, self.foot_color)
         
         # Draw joints
-        pygame.draw.circle(surface, (255, 255, 255), (int(self.hip_pos.x), int(self.hip_pos.y)), 8)
-        pygame.draw.circle(surface, (255, 255, 255), (int(self.knee_pos.x), int(self.knee_pos.y)), 6)
-        pygame.draw.circle(surface, (255, 255, 255), (int(self.ankle_pos.x), int(self.ankle_pos.y)), 5)
-        
-    def draw_limb(self, surface, start_pos, end_pos, width, color):
-        # Calculate angle of the limb
-        angle = math.atan2(end_pos[1] - start_pos[1], end_pos[0] - start_pos[0])
-        
-        # Calculate corners of rectangle
-        length = pygame.Vector2(start_pos).distance_to(end_pos)
-        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        pygame.draw.circle(surface, (255, 255, 255), (int(hip_pos.x), int(hip_pos.y)), max(1, int(8 * scale)))
+        pygame.draw.circle(surface, (255, 255, 255), (int(knee_pos.x), int(knee_pos.y)), max(1, int(6 * scale)))
+        pygame.draw.circle(surface, (255, 255, 255), (int(ankle_pos.x), int(ankle_pos.y)), max(1, int(5 * scale)))
         
-        # Four corners of rectangle
-        p1 = (start_pos[0] - width/2 * sin_a, start_pos[1] + width/2 * cos_a)
-        p2 = (start_pos[0] + width/2 * sin_a, start_pos[1] - width/2 * cos_a)
-        p3 = (end_pos[0] + width/2 * sin_a, end_pos[1] - width/2 * cos_a)
-        p4 = (end_pos[0] - width/2 * sin_a, end_pos[1] + width/2 * cos_a)
+    def draw_at(self, surface, target):
+        """Draw the leg posed for `target` without changing its simulated pose."""
+        # update() rebinds the joints and geometry rather than changing them in place
+        ankle_pos, knee_pos, geometry = self.ankle_pos, self.knee_pos, self.geometry
+        self.update(target)
+        self.draw(surface)
+        self.ankle_pos, self.knee_pos, self.geometry = ankle_pos, knee_pos, geometry
         
-        pygame.draw.polygon(surface, color, [p1, p2, p3, p4])
+    def draw_limb(self, surface, corners, scale, color):
+        pygame.draw.polygon(surface, color, [(x * scale, y * scale) for x, y in corners])
         
     def check_footbag_collision(self, footbag):
-        # Determine foot direction based on ankle position relative to hip
-        if self.ankle_pos.x > self.hip_pos.x:
-            # Ankle is to the right of hip, so foot points right
-            foot_end = (self.ankle_pos.x + self.foot_length, self.ankle_pos.y)
-            foot_rect = pygame.Rect(
-                self.ankle_pos.x, 
-                self.ankle_pos.y - self.foot_height/2,
-                self.foot_length,
-                self.foot_height
-            )
-        else:
-            # Ankle is to the left of hip, so foot points left
-            foot_end = (self.ankle_pos.x - self.foot_length, self.ankle_pos.y)
-            foot_rect = pygame.Rect(
-                self.ankle_pos.x - self.foot_length, 
-                self.ankle_pos.y - self.foot_height/2,
-                self.foot_length,
-                self.foot_height
-            )
-        
-        # Inflate rect slightly for better collision detection
-        foot_rect.inflate_ip(5, 5)
-        
-        # Get the bounding rect for the blob
-        footbag_rect = footbag.get_collision_rect()
-        
-        if foot_rect.colliderect(footbag_rect):
-            # Calculate bounce direction and velocity
-            # Get the center of the foot based on foot_end
-            foot_center = pygame.Vector2(
-                (self.ankle_pos.x + foot_end[0]) / 2, 
-                self.ankle_pos.y
-            )
-            bounce_direction = pygame.Vector2(footbag.position) - foot_center
+        geometry = self.geometry
+        
+        if geometry.foot_rect.colliderect(footbag.geometry.rect):
+            # Bounce away from the centre of the foot
+            bounce_direction = pygame.Vector2(footbag.position) - geometry.foot_center
             bounce_direction.normalize_ip()
             
             # Bounce velocity depends on the leg's movement speed, with reduced bounciness
-            leg_velocity = pygame.Vector2(pygame.mouse.get_rel()) * 0.15  # Reduced multiplier
+            if self.input is not None:
+                velocity = self.input.get_velocity()
+            else:
+                velocity = pygame.mouse.get_rel()
+            leg_velocity = pygame.Vector2(velocity) * 0.15  # Reduced multiplier
             bounce_speed = max(6, leg_velocity.length() + 4)  # Reduced base speed
             
             # Apply force and set collision for deformation effect
@@ -185,22 +229,15 @@ class Leg:
             footbag.collision_timer = 10
             
             # Add some random spin to make it more interesting
-            for i in range(footbag.num_points):
-                footbag.point_velocities[i] += pygame.Vector2(
-                    random.uniform(-1, 1),
-                    random.uniform(-1, 1)
-                )
+            self.add_spin(footbag)
             
+            self.notify_kick(footbag, "foot", bounce_speed)
             return True
             
         # Check calf collision with blob points
-        calf_line = (self.knee_pos, self.ankle_pos)
-        if self.polygon_line_collision(calf_line, footbag.points):
+        if self.calf_collision(footbag):
             # Bounce off calf with reduced bounciness
-            bounce_direction = pygame.Vector2(footbag.position) - pygame.Vector2(
-                (self.knee_pos.x + self.ankle_pos.x) / 2, 
-                (self.knee_pos.y + self.ankle_pos.y) / 2
-            )
+            bounce_direction = footbag.position - geometry.calf_center
             bounce_direction.normalize_ip()
             
             # Apply force and set collision for deformation effect
@@ -209,16 +246,52 @@ class Leg:
             footbag.collision_timer = 8
             
             # Add some random spin to make it more interesting
-            for i in range(footbag.num_points):
-                footbag.point_velocities[i] += pygame.Vector2(
-                    random.uniform(-1, 1),
-                    random.uniform(-1, 1)
-                )
+            self.add_spin(footbag)
                 
+            self.notify_kick(footbag, "calf", 6)
             return True
             
         return False
     
+    def add_spin(self, footbag):
+        """Jitter every blob point's velocity, drawn in one batch."""
+        jitter = self.rng.uniform(-1, 1, (footbag.num_points, 2)).tolist()
+        for point_velocity, (jx, jy) in zip(footbag.point_velocities, jitter):
+            point_velocity.x += jx
+            point_velocity.y += jy
+    
+    def notify_kick(self, footbag, part, speed):
+        """Count the kick on the footbag and tell listeners that `part` of the leg kicked it at `speed`."""
+        footbag.kicks += 1
+        for listener in self.listeners:
+            listener.on_kick(self, footbag, part, speed)
+    
+    def calf_collision(self, footbag):
+        """Check if any blob point is inside the calf capsule."""
+        geometry = self.geometry
+        length = geometry.calf_length
+        if length == 0:
+            return False
+        start_x, start_y = geometry.calf_start
+        dir_x, dir_y = geometry.calf_direction
+        radius = geometry.calf_radius
+        
+        # Skip the points when the blob's bounding circle misses the capsule
+        center = footbag.position
+        projection = max(0, min(length, (center.x - start_x) * dir_x + (center.y - start_y) * dir_y))
+        reach = radius + footbag.geometry.radius
+        if math.hypot(center.x - start_x - dir_x * projection, center.y - start_y - dir_y * projection) > reach:
+            return False
+        
+        for point in footbag.points:
+            offset_x = point.x - start_x
+            offset_y = point.y - start_y
+            # Clamp the projection to the segment
+            projection = max(0, min(length, offset_x * dir_x + offset_y * dir_y))
+            if math.hypot(offset_x - dir_x * projection, offset_y - dir_y * projection) <= radius:
+                return True
+        return False
+    
     def line_circle_collision(self, line, circle_pos, circle_radius):
         # Simplified line-circle collision detection
         x1, y1 = line[0]
@@ -255,32 +328,3 @@ class Leg:
         distance = math.sqrt((cx - closest_x)**2 + (cy - closest_y)**2)
         
         return distance <= circle_radius
-        
-    def polygon_line_collision(self, line, polygon_points):
-        """Check if any of the polygon points are near enough to the line"""
-        line_start, line_end = line
-        line_vec = pygame.Vector2(line_end) - pygame.Vector2(line_start)
-        line_length = line_vec.length()
-        
-        if line_length == 0:
-            return False
-            
-        line_dir = line_vec / line_length
-        
-        # Check each point's distance to the line
-        for point in polygon_points:
-            point_to_start = pygame.Vector2(point) - pygame.Vector2(line_start)
-            projection = point_to_start.dot(line_dir)
-            
-            # Clamp projection to line segment
-            projection = max(0, min(line_length, projection))
-            
-            # Get closest point on line
-            closest_point = pygame.Vector2(line_start) + line_dir * projection
-            
-            # Check distance
-            distance = (pygame.Vector2(point) - closest_point).length()
-            if distance <= self.calf_width / 2 + 5:  # Half width plus a little buffer
-                return True
-                
-        return False
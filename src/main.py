@@ -1,14 +1,42 @@
+import argparse
+import atexit
 import pygame
 import sys
-from src.constants import init_display
+from src.constants import RENDER_SCALE, init_display
 from src.game import Game
+from src.softbody import SoftBodySolver
+from src.leaderboard import RemoteScoreStore, parse_address
+from src.metrics import serve_metrics
+from src.trails import MotionTrails
+from src.input import MouseInput
+from src.predict import MotionPredictor
 
 def main():
+    parser = argparse.ArgumentParser(description="Psychedelic Footbag")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE,
+                        help="internal render resolution as a fraction of the world size")
+    parser.add_argument("--fullscreen", action="store_true", help="start in fullscreen")
+    parser.add_argument("--footbags", type=int, default=1, help="number of footbags to juggle")
+    parser.add_argument("--soft-body", type=int, default=0, metavar="ITERATIONS",
+                        help="keep blob edge lengths and area with this many solver iterations")
+    parser.add_argument("--leaderboard", metavar="HOST:PORT",
+                        help="submit scores to a leaderboard service instead of the local database")
+    parser.add_argument("--input-latency", action="store_true",
+                        help="print input-to-photon latency statistics on exit")
+    parser.add_argument("--trails", type=int, default=0, metavar="FRAMES",
+                        help="leave motion trails that fade to black within this many frames")
+    parser.add_argument("--predict", choices=["render", "ik"],
+                        help="extrapolate the mouse to display time when drawing the leg (render), "
+                             "or also for the leg's physics (ik)")
+    parser.add_argument("--metrics", metavar="HOST:PORT",
+                        help="serve Prometheus metrics of the game loop on this address")
+    args = parser.parse_args()
+    
     # Initialize pygame
     pygame.init()
     
     # Create display
-    screen = init_display()
+    display = init_display(args.render_scale, args.fullscreen)
     
     # Hide mouse cursor
     pygame.mouse.set_visible(False)
@@ -17,11 +45,20 @@ def main():
     pygame.event.set_grab(True)
     
     # Create game instance
-    game = Game()
+    store = RemoteScoreStore(*parse_address(args.leaderboard)) if args.leaderboard else None
+    soft_body = SoftBodySolver(args.soft_body) if args.soft_body else None
+    trails = MotionTrails.from_length(args.trails) if args.trails else None
+    game = Game(store, display, num_footbags=args.footbags, soft_body=soft_body, trails=trails)
+    if args.predict:
+        game.set_input(MouseInput(game, predictor=MotionPredictor(), predict_ik=args.predict == "ik"))
+    if args.metrics:
+        game.metrics = serve_metrics(game, args.metrics, ("update", "draw", "present"))
+    if args.input_latency:
+        atexit.register(lambda: print(game.input.latency_report()))
     
     # Main game loop - keep running the game
     while True:
-        game.run(screen)
+        game.run(display)
         
         # Check if we need to exit
         for event in pygame.event.get():
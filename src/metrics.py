@@ -0,0 +1,164 @@
+import bisect
+import gc
+import http.server
+import os
+import resource
+import threading
+import time
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9108
+
+# Upper bounds of the frame-time histogram buckets, in seconds
+FRAME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.004, 0.008, 0.016, 0.033, 0.066, 0.1)
+
+class GameMetrics:
+    """Counters and per-phase frame-time histograms for one game loop.
+
+    The loop calls observe() for every phase it times and step() once per simulated
+    frame; kicks and wall hits arrive through the listener hooks. Everything is a plain
+    integer or float owned by the loop thread, so recording never takes a lock. A
+    MetricsServer reads the values from another thread; a scrape may see one phase a
+    frame ahead of another, which is fine for monitoring.
+    """
+
+    def __init__(self, game, phases=("update", "draw")):
+        self.game = game
+        self.started = time.time()
+        self.steps = 0
+        self.kicks = 0
+        self.wall_hits = 0
+        # Phase -> bucket counts (one per bound plus +Inf) and total seconds
+        self.buckets = {phase: [0] * (len(FRAME_BUCKETS) + 1) for phase in phases}
+        self.seconds = dict.fromkeys(phases, 0.0)
+
+        for leg in game.legs:
+            leg.listeners.append(self)
+        for footbag in game.footbags:
+            footbag.listeners.append(self)
+
+    def on_kick(self, leg, footbag, part, speed):
+        self.kicks += 1
+
+    def on_wall_hit(self, footbag, normal):
+        self.wall_hits += 1
+
+    def step(self):
+        self.steps += 1
+
+    def observe(self, phase, seconds):
+        """Add one timing of `phase` to its histogram."""
+        self.buckets[phase][bisect.bisect_left(FRAME_BUCKETS, seconds)] += 1
+        self.seconds[phase] += seconds
+
+    def collision_checks(self):
+        return sum(reach_sleep.checks_run for reach_sleep in self.game.reach_sleeps)
+
+def resident_bytes():
+    """Current resident set size, or the peak where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class MetricsServer:
+    """Serves the metrics of a GameMetrics in the Prometheus text format.
+
+    Runs an HTTP server on a daemon thread, bound to localhost by default. Scrapes only
+    read the loop's counters; the per-second rates are worked out from the difference
+    to the previous scrape.
+    """
+
+    def __init__(self, metrics, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.metrics = metrics
+        self._previous = (time.perf_counter(), metrics.steps, metrics.kicks + metrics.wall_hits)
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = server.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.address = self.httpd.server_address[:2]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self.address
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def rates(self):
+        """Steps and collisions per second since the previous call."""
+        metrics = self.metrics
+        now = time.perf_counter()
+        steps = metrics.steps
+        collisions = metrics.kicks + metrics.wall_hits
+        then, previous_steps, previous_collisions = self._previous
+        self._previous = (now, steps, collisions)
+        elapsed = max(now - then, 1e-9)
+        return (steps - previous_steps) / elapsed, (collisions - previous_collisions) / elapsed
+
+    def render(self):
+        metrics = self.metrics
+        steps_per_second, collisions_per_second = self.rates()
+        lines = []
+
+        def metric(name, kind, help, samples):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {value}")
+
+        lines.append("# HELP footbag_frame_seconds Time spent in each phase of a frame.")
+        lines.append("# TYPE footbag_frame_seconds histogram")
+        for phase, counts in metrics.buckets.items():
+            counts = list(counts)
+            total = metrics.seconds[phase]
+            cumulative = 0
+            for bound, bucket in zip(FRAME_BUCKETS + (float("inf"),), counts):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'footbag_frame_seconds_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+            lines.append(f'footbag_frame_seconds_sum{{phase="{phase}"}} {total}')
+            lines.append(f'footbag_frame_seconds_count{{phase="{phase}"}} {cumulative}')
+
+        metric("footbag_steps_total", "counter", "Simulated frames.", [("", metrics.steps)])
+        metric("footbag_steps_per_second", "gauge", "Simulated frames per second since the last scrape.",
+               [("", round(steps_per_second, 3))])
+        metric("footbag_collisions_total", "counter", "Kicks and wall hits.",
+               [('{kind="kick"}', metrics.kicks), ('{kind="wall"}', metrics.wall_hits)])
+        metric("footbag_collisions_per_second", "gauge", "Kicks and wall hits per second since the last scrape.",
+               [("", round(collisions_per_second, 3))])
+        metric("footbag_collision_checks_total", "counter", "Leg-footbag collision checks run.",
+               [("", metrics.collision_checks())])
+        metric("footbag_score", "gauge", "Score of the current game.", [("", metrics.game.score)])
+        metric("python_gc_objects_pending", "gauge", "Allocations counted towards the next collection.",
+               [(f'{{generation="{generation}"}}', count) for generation, count in enumerate(gc.get_count())])
+        metric("python_gc_collections_total", "counter", "Garbage collections run.",
+               [(f'{{generation="{generation}"}}', stats["collections"])
+                for generation, stats in enumerate(gc.get_stats())])
+        metric("process_resident_memory_bytes", "gauge", "Resident memory size.", [("", resident_bytes())])
+        metric("process_start_time_seconds", "gauge", "Start time of the game loop.", [("", metrics.started)])
+        return "\n".join(lines) + "\n"
+
+def serve_metrics(game, address, phases=("update", "draw")):
+    """Attach GameMetrics to a game and serve them on "host:port". Returns the metrics."""
+    host, _, port = address.rpartition(":")
+    metrics = GameMetrics(game, phases)
+    MetricsServer(metrics, host or DEFAULT_HOST, int(port)).start()
+    return metrics
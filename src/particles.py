@@ -0,0 +1,121 @@
+import pygame
+import numpy as np
+from src.constants import WIDTH, HEIGHT, COLORS
+
+class ParticleSystem:
+    """Fixed-capacity particle pool stored in NumPy arrays.
+
+    Live particles are always packed into the first `count` slots, so update,
+    culling and rendering are plain slices with no per-particle Python objects.
+    """
+
+    def __init__(self, capacity=100_000, rng=None):
+        self.capacity = capacity
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # Particle pool
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.color_index = np.zeros(capacity, dtype=np.uint8)
+        self.count = 0  # Number of live particles
+
+        # Motion parameters
+        self.gravity = 0.15
+        self.drag = 0.97
+
+        # Burst parameters
+        self.kick_burst = 60
+        self.wall_burst = 30
+        self.min_life = 20
+        self.max_life = 50
+
+        # Colour palette mapped to surface pixel values, built on first draw
+        self._palette = None
+        self._palette_format = None
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, position, velocity, amount, speed, color_index=None, direction=None, spread=np.pi):
+        """Spawn a burst of particles. Particles that do not fit in the pool are dropped."""
+        amount = min(amount, self.capacity - self.count)
+        if amount <= 0:
+            return
+        start, end = self.count, self.count + amount
+
+        # Random directions around `direction` (or all around when not given)
+        base_angle = 0.0 if direction is None else np.arctan2(direction[1], direction[0])
+        angles = base_angle + self.rng.uniform(-spread, spread, amount)
+        speeds = self.rng.uniform(0.2, 1.0, amount) * speed
+
+        self.positions[start:end] = position
+        self.velocities[start:end, 0] = np.cos(angles) * speeds + velocity[0]
+        self.velocities[start:end, 1] = np.sin(angles) * speeds + velocity[1]
+        self.life[start:end] = self.rng.uniform(self.min_life, self.max_life, amount)
+        if color_index is None:
+            self.color_index[start:end] = self.rng.integers(0, len(COLORS), amount)
+        else:
+            self.color_index[start:end] = color_index
+        self.count = end
+
+    def on_kick(self, leg, footbag, part, speed):
+        # Burst from the footbag in the direction it was sent
+        self.emit(footbag.position, footbag.velocity * 0.3, self.kick_burst, speed * 0.8,
+                  direction=footbag.velocity, spread=np.pi / 2)
+
+    def on_wall_hit(self, footbag, normal):
+        # Spray off the wall along its normal
+        contact = footbag.position - normal * footbag.base_radius
+        self.emit(contact, (0, 0), self.wall_burst, 4,
+                  color_index=footbag.color_index, direction=normal, spread=np.pi / 3)
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        positions = self.positions[:n]
+        velocities = self.velocities[:n]
+        life = self.life[:n]
+
+        velocities[:, 1] += self.gravity
+        velocities *= self.drag
+        positions += velocities
+        life -= 1
+
+        # Cull dead and off-screen particles by compacting the live ones to the front
+        alive = ((life > 0) & (positions[:, 0] >= 0) & (positions[:, 0] < WIDTH)
+                 & (positions[:, 1] >= 0) & (positions[:, 1] < HEIGHT))
+        live = int(np.count_nonzero(alive))
+        if live < n:
+            self.positions[:live] = positions[alive]
+            self.velocities[:live] = velocities[alive]
+            self.life[:live] = life[alive]
+            self.color_index[:live] = self.color_index[:n][alive]
+            self.count = live
+
+    def draw(self, surface):
+        n = self.count
+        if n == 0:
+            return
+        width, height = surface.get_size()
+        scale = width / WIDTH
+
+        # Map the palette to this surface's pixel format once
+        if self._palette_format != (surface.get_bitsize(), surface.get_masks()):
+            self._palette = np.array([surface.map_rgb(color) for color in COLORS], dtype=np.uint32)
+            self._palette_format = (surface.get_bitsize(), surface.get_masks())
+
+        xs = (self.positions[:n, 0] * scale).astype(np.intp)
+        ys = (self.positions[:n, 1] * scale).astype(np.intp)
+        np.clip(xs, 0, width - 2, out=xs)
+        np.clip(ys, 0, height - 2, out=ys)
+        colors = self._palette[self.color_index[:n]]
+
+        # Write every particle as a 2x2 block straight into the pixel buffer
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[xs, ys] = colors
+        pixels[xs + 1, ys] = colors
+        pixels[xs, ys + 1] = colors
+        pixels[xs + 1, ys + 1] = colors
+        del pixels  # Unlock the surface
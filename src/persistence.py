@@ -0,0 +1,148 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Default location of the score database
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".psychedelic_footbag", "scores.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    score INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    bounces INTEGER NOT NULL,
+    max_height REAL NOT NULL,
+    mean_kick_speed REAL NOT NULL,
+    max_kick_speed REAL NOT NULL,
+    kick_speeds TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_score ON sessions (score DESC);
+"""
+
+INSERT_SESSION = (
+    "INSERT INTO sessions (finished_at, score, duration, bounces, max_height, "
+    "mean_kick_speed, max_kick_speed, kick_speeds) VALUES (:finished_at, :score, "
+    ":duration, :bounces, :max_height, :mean_kick_speed, :max_kick_speed, :kick_speeds)"
+)
+
+class SessionStats:
+    """Collects statistics for a single game session.
+
+    Attach it as a listener to the leg and footbag, and call observe() once per frame.
+    """
+
+    def __init__(self, ground_y):
+        self.ground_y = ground_y
+        self.kick_speeds = []
+        self.reset()
+
+    def reset(self):
+        self.start_time = time.time()
+        self.bounces = 0
+        self.max_height = 0.0
+        self.kick_speeds.clear()
+
+    def on_kick(self, leg, footbag, part, speed):
+        self.bounces += 1
+        self.kick_speeds.append(round(speed, 2))
+
+    def on_wall_hit(self, footbag, normal):
+        pass
+
+    def observe(self, footbag):
+        # Height is measured from the ground up
+        height = self.ground_y - footbag.position.y
+        if height > self.max_height:
+            self.max_height = height
+
+    def finish(self, score):
+        """Return the session as a record ready to be stored."""
+        speeds = self.kick_speeds
+        now = time.time()
+        return {
+            "finished_at": now,
+            "score": score,
+            "duration": now - self.start_time,
+            "bounces": self.bounces,
+            "max_height": self.max_height,
+            "mean_kick_speed": sum(speeds) / len(speeds) if speeds else 0.0,
+            "max_kick_speed": max(speeds) if speeds else 0.0,
+            "kick_speeds": json.dumps(speeds),
+        }
+
+class ScoreStore:
+    """SQLite score store with a background writer thread.
+
+    submit() only puts the record on a queue, so it never blocks a frame. The writer
+    thread commits queued records in batches. The top of the leaderboard is read once
+    at startup and then kept up to date in memory.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, top_n=5, batch_size=32, flush_interval=0.5):
+        self.path = path
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # Fast startup read of the leaderboard, served from the score index
+        connection = sqlite3.connect(path)
+        connection.executescript(SCHEMA)
+        self.leaderboard = connection.execute(
+            "SELECT score, finished_at FROM sessions ORDER BY score DESC LIMIT ?", (top_n,)
+        ).fetchall()
+        connection.close()
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, name="score-writer", daemon=True)
+        self._thread.start()
+        self._closed = False
+        atexit.register(self.close)
+
+    def submit(self, record):
+        """Queue a session record for writing and update the in-memory leaderboard."""
+        self._queue.put(record)
+        self.leaderboard.append((record["score"], record["finished_at"]))
+        self.leaderboard.sort(key=lambda entry: entry[0], reverse=True)
+        del self.leaderboard[self.top_n:]
+
+    def top(self, n=None):
+        return self.leaderboard[:n or self.top_n]
+
+    def close(self):
+        """Flush pending records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _writer(self):
+        connection = sqlite3.connect(self.path)
+        connection.executescript(SCHEMA)
+        running = True
+        while running:
+            # Block for the first record, then gather whatever else arrives shortly after
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                running = False
+
+            if batch:
+                with connection:
+                    connection.executemany(INSERT_SESSION, batch)
+        connection.close()
@@ -0,0 +1,154 @@
+import argparse
+import math
+import numpy as np
+from src.constants import WIDTH, HEIGHT, FPS
+
+class MotionPredictor:
+    """Alpha-beta filter over timestamped mouse samples that extrapolates to display time.
+
+    update() folds in each sample: the filter predicts the position at the sample's time
+    from its position and velocity, and moves both toward the sample by `alpha` and
+    `beta` of the residual. predict() extrapolates the last sample with the filtered
+    velocity to a later time, such as when the frame being drawn will be on screen
+    (the last sample itself is exact; the filter is there to smooth the velocity).
+
+    Extrapolation is clamped against overshoot: it looks at most `max_lead` seconds
+    ahead and `max_distance` world units away, stays inside the world, and stops once no
+    sample has arrived for `stale_after` seconds, since then the mouse has stopped and
+    the last sample is the best guess.
+    """
+
+    def __init__(self, alpha=0.3, beta=0.1, max_lead=0.05, max_distance=80.0, stale_after=0.02):
+        self.alpha = alpha
+        self.beta = beta
+        self.max_lead = max_lead
+        self.max_distance = max_distance
+        self.stale_after = stale_after
+        self.reset()
+
+    def reset(self):
+        self.t = None  # Time of the last sample
+        self.last = (0.0, 0.0)  # The last sample itself
+        self.x = self.y = 0.0
+        self.vx = self.vy = 0.0
+
+    def update(self, t, x, y):
+        """Fold in the sample (x, y) taken at time t (seconds)."""
+        dt = t - self.t if self.t is not None else math.inf
+        self.last = (x, y)
+        if dt > self.stale_after:
+            # First sample, or the mouse was at rest: start again from standstill
+            self.x, self.y = x, y
+            self.vx = self.vy = 0.0
+            self.t = t
+            return
+        if dt <= 0:
+            return
+        residual_x = x - (self.x + self.vx * dt)
+        residual_y = y - (self.y + self.vy * dt)
+        self.x += self.vx * dt + self.alpha * residual_x
+        self.y += self.vy * dt + self.alpha * residual_y
+        self.vx += self.beta * residual_x / dt
+        self.vy += self.beta * residual_y / dt
+        self.t = t
+
+    def predict(self, t):
+        """Expected position at time t, or the last sample when there is nothing to extrapolate."""
+        if self.t is None or t - self.t > self.stale_after:
+            return self.last
+        lead = min(max(t - self.t, 0.0), self.max_lead)
+        dx = self.vx * lead
+        dy = self.vy * lead
+        distance = math.hypot(dx, dy)
+        if distance > self.max_distance:
+            dx *= self.max_distance / distance
+            dy *= self.max_distance / distance
+        x, y = self.last
+        return (min(max(x + dx, 0.0), WIDTH), min(max(y + dy, 0.0), HEIGHT))
+
+class LeadEstimate:
+    """Running estimate of how long after some moment the frame reaches the screen."""
+
+    def __init__(self, initial=1 / FPS, smoothing=0.1):
+        self.seconds = initial
+        self.smoothing = smoothing
+        self.started = None
+
+    def start(self, now):
+        self.started = now
+
+    def finish(self, now):
+        if self.started is not None:
+            self.seconds += self.smoothing * (now - self.started - self.seconds)
+            self.started = None
+
+# Synthetic mouse paths for measuring prediction, positions in world units at time t
+def circle_path(t):
+    angle = 2 * math.pi * 1.5 * t
+    return (WIDTH / 2 + 180 * math.cos(angle), HEIGHT / 2 + 180 * math.sin(angle))
+
+def zigzag_path(t):
+    # 1200 units/s back and forth, turning around instantly
+    phase = (t * 1200 / 500) % 2
+    return (150 + 500 * (phase if phase < 1 else 2 - phase), HEIGHT - 150)
+
+def flick_path(t):
+    # Quick eased moves back and forth between two spots, pausing in between
+    move, phase = divmod(t, 0.6)
+    progress = min(phase / 0.15, 1.0)
+    eased = progress * progress * (3 - 2 * progress)
+    if int(move) % 2:
+        eased = 1 - eased
+    return (200 + 400 * eased, HEIGHT - 130 + 40 * eased)
+
+PATHS = {"circle": circle_path, "zigzag": zigzag_path, "flick": flick_path}
+
+def measure(path, seconds=10.0, sample_rate=1000, lead=1 / FPS, predictor=None, seed=0):
+    """Compare drawing the last sample with drawing the prediction on a synthetic path.
+
+    The mouse is sampled `sample_rate` times a second with whole-pixel positions and a
+    little timing jitter; each frame samples the input and reaches the screen `lead`
+    seconds later. Returns the distances between what is drawn and where the mouse
+    actually is at display time, as (raw errors, predicted errors) arrays.
+    """
+    predictor = predictor if predictor is not None else MotionPredictor()
+    rng = np.random.default_rng(seed)
+    sample_times = np.arange(0, seconds, 1 / sample_rate) + rng.uniform(0, 0.2 / sample_rate, int(seconds * sample_rate))
+    raw_errors, predicted_errors = [], []
+    sample = 0
+    for frame in range(int(seconds * FPS)):
+        now = frame / FPS
+        while sample < len(sample_times) and sample_times[sample] <= now:
+            t = sample_times[sample]
+            x, y = path(t)
+            predictor.update(t, round(x), round(y))
+            sample += 1
+        if predictor.t is None:
+            continue
+        shown_at = now + lead
+        true_x, true_y = path(shown_at)
+        raw_x, raw_y = predictor.last
+        predicted_x, predicted_y = predictor.predict(shown_at)
+        raw_errors.append(math.hypot(raw_x - true_x, raw_y - true_y))
+        predicted_errors.append(math.hypot(predicted_x - true_x, predicted_y - true_y))
+    return np.array(raw_errors), np.array(predicted_errors)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how much mouse extrapolation cuts the on-screen lag")
+    parser.add_argument("--paths", nargs="*", choices=sorted(PATHS), default=sorted(PATHS), help="synthetic paths")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of every path")
+    parser.add_argument("--sample-rate", type=int, default=1000, help="mouse samples per second")
+    parser.add_argument("--lead-ms", type=float, default=1000 / FPS, help="time from sampling to display")
+    parser.add_argument("--alpha", type=float, default=0.3, help="filter position gain")
+    parser.add_argument("--beta", type=float, default=0.1, help="filter velocity gain")
+    args = parser.parse_args()
+
+    for name in args.paths:
+        predictor = MotionPredictor(args.alpha, args.beta)
+        raw, predicted = measure(PATHS[name], args.seconds, args.sample_rate, args.lead_ms / 1000, predictor)
+        print(f"{name:7s} drawn-vs-mouse error  raw: mean {raw.mean():6.1f}  p95 {np.percentile(raw, 95):6.1f}  "
+              f"max {raw.max():6.1f}   predicted: mean {predicted.mean():6.1f}  "
+              f"p95 {np.percentile(predicted, 95):6.1f}  max {predicted.max():6.1f}  world units")
+
+if __name__ == "__main__":
+    main()
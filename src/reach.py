@@ -0,0 +1,94 @@
+import math
+
+class ReachSleep:
+    """Skips leg-vs-footbag collision checks while the footbag cannot reach the leg.
+
+    Whatever the mouse does, the ankle stays within `thigh_length + calf_length - 40` of
+    the fixed hip and the foot sticks out horizontally from it, so the leg always lies
+    within a fixed distance of a horizontal segment through the hip. When the footbag is
+    outside that region, the earliest frame it can enter is found from its speed and
+    gravity, and the narrow-phase checks are skipped until then. A wall or ceiling bounce
+    or a kick by any leg changes the trajectory, so it ends the sleep early.
+    """
+
+    def __init__(self, leg, footbag, blob_slack=None):
+        self.leg = leg
+        self.footbag = footbag
+        # Room for the blob to deform further while asleep
+        self.blob_slack = blob_slack if blob_slack is not None else footbag.base_radius
+        self.sleep_frames = 0
+        self.bounces = self.count_bounces()
+
+        # Counters (kept across resets)
+        self.checks_run = 0
+        self.checks_skipped = 0
+
+    def reset(self):
+        self.sleep_frames = 0
+        self.bounces = self.count_bounces()
+
+    def count_bounces(self):
+        """Wall hits and kicks of the footbag so far; each one changes its trajectory."""
+        return self.footbag.wall_hits + self.footbag.kicks
+
+    def reach(self):
+        """Distance from the hip segment within which the leg can collide with anything."""
+        leg = self.leg
+        max_extension = leg.thigh_length + leg.calf_length - 40
+        # Foot rect half-height, inflate and integer truncation; calf hit distance
+        foot_margin = math.hypot(leg.foot_height / 2 + 3.5, 3.5)
+        calf_margin = leg.calf_width / 2 + 5
+        return max_extension + max(foot_margin, calf_margin)
+
+    def distance_to_reach(self):
+        """How far the footbag has to travel before it can touch the leg."""
+        leg = self.leg
+        footbag = self.footbag
+        center = footbag.position
+
+        # Distance from the centre to the segment the foot can slide along
+        dx = max(abs(center.x - leg.hip_pos.x) - leg.foot_length, 0)
+        dy = center.y - leg.hip_pos.y
+        distance = math.hypot(dx, dy)
+
+        # The foot test uses the blob's bounding box, whose corners can stick out by sqrt(2)
+        extent = (max(footbag.geometry.radius, footbag.base_radius) + self.blob_slack) * math.sqrt(2) + 1
+        return distance - self.reach() - extent
+
+    def frames_until(self, distance):
+        """Smallest number of frames in which the footbag can move `distance`.
+
+        After k frames it has moved at most k*|v| + g*k*(k+1)/2.
+        """
+        speed = self.footbag.velocity.length()
+        g = self.footbag.gravity
+        b = speed + g / 2
+        if g > 0:
+            k = (-b + math.sqrt(b * b + 2 * g * distance)) / g
+        elif speed > 0:
+            k = distance / speed
+        else:
+            return math.inf
+        return max(1, math.ceil(k))
+
+    def should_check(self):
+        """Return True if the narrow-phase collision check has to run this frame."""
+        bounces = self.count_bounces()
+        if bounces != self.bounces:
+            self.bounces = bounces
+            self.sleep_frames = 0
+
+        if self.sleep_frames > 0:
+            self.sleep_frames -= 1
+            self.checks_skipped += 1
+            return False
+
+        distance = self.distance_to_reach()
+        if distance <= 0:
+            self.checks_run += 1
+            return True
+
+        # Out of reach now and for the next frames_until() - 1 frames
+        self.sleep_frames = self.frames_until(distance) - 1
+        self.checks_skipped += 1
+        return False
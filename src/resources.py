@@ -0,0 +1,43 @@
+import pygame
+from src.particles import ParticleSystem
+
+class Resources:
+    """Session-scoped resources that survive game restarts.
+
+    Owns the fonts, cached text and backdrop surfaces, and preallocated state such as
+    the particle pool, so restarting a game only has to reset numbers.
+    """
+
+    def __init__(self, max_text_surfaces=512, rng=None):
+        self.fonts = {}
+        self.text_surfaces = {}
+        self.max_text_surfaces = max_text_surfaces
+        self.backdrops = {}
+        self.particles = ParticleSystem(rng=rng)
+
+    def font(self, size):
+        """Default font at `size`, loaded once per session."""
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def text(self, size, text, color):
+        """Rendered (antialiased) text, cached by font size, text and colour."""
+        key = (size, text, color)
+        surface = self.text_surfaces.get(key)
+        if surface is None:
+            # Text like the score changes over time, so keep the cache bounded
+            if len(self.text_surfaces) >= self.max_text_surfaces:
+                self.text_surfaces.clear()
+            surface = self.text_surfaces[key] = self.font(size).render(text, True, color)
+        return surface
+
+    def backdrop(self, size, color):
+        """A surface of `size` filled with an RGBA colour."""
+        key = (size, color)
+        surface = self.backdrops.get(key)
+        if surface is None:
+            surface = self.backdrops[key] = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(color)
+        return surface
@@ -0,0 +1,298 @@
+import argparse
+import collections
+import os
+import random
+import time
+import zlib
+
+# Headless runs never open a real window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from src.game import Game
+from src.constants import FPS
+from src.input import PlayerInput
+from src.bot import AutoPlayer
+from src.persistence import ScoreStore
+from src.state import GameState
+
+class LoopbackNetwork:
+    """In-process network between rollback peers with injected latency and packet loss.
+
+    Time is counted in frames (advance() once per frame) so runs are reproducible. Each
+    packet is delayed by `latency` plus up to `jitter` frames, so packets can arrive out
+    of order, and is dropped with probability `loss`.
+    """
+
+    def __init__(self, latency=3, jitter=0, loss=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)  # Separate from the games' random generators
+        self.now = 0
+        self.inboxes = {}
+        self.sent = 0
+        self.dropped = 0
+
+    def endpoint(self, address):
+        self.inboxes[address] = []
+        return LoopbackEndpoint(self, address)
+
+    def advance(self):
+        self.now += 1
+
+class LoopbackEndpoint:
+    def __init__(self, network, address):
+        self.network = network
+        self.address = address
+
+    def send(self, to, packet):
+        network = self.network
+        network.sent += 1
+        if network.rng.random() < network.loss:
+            network.dropped += 1
+            return
+        deliver_at = network.now + network.latency + network.rng.randint(0, network.jitter)
+        network.inboxes[to].append((deliver_at, packet))
+
+    def receive(self):
+        """Return the packets that have arrived by now."""
+        inbox = self.network.inboxes[self.address]
+        now = self.network.now
+        arrived = [packet for deliver_at, packet in inbox if deliver_at <= now]
+        if arrived:
+            inbox[:] = [entry for entry in inbox if entry[0] > now]
+        return arrived
+
+class RollbackSession:
+    """GGPO-style rollback for one player of a multi-player Game.
+
+    Every frame the local input is sampled once and sent to the other players together
+    with every input they have not acknowledged yet, so lost packets are covered by later
+    ones. Missing remote inputs are predicted by repeating the player's last confirmed
+    input. When a confirmed input differs from the prediction that was used, the game is
+    restored to the snapshot of that frame and re-simulated up to the present with
+    kick and wall-hit listeners muted. A peer that gets more than `max_rollback` frames
+    ahead of the inputs it has confirmed stalls until they arrive.
+
+    Games that end are restarted in place as part of the simulation, so every peer
+    restarts on the same frame.
+    """
+
+    def __init__(self, game, player, endpoint, input_source, max_rollback=8):
+        self.game = game
+        self.player = player
+        self.endpoint = endpoint
+        self.input_source = input_source
+        self.max_rollback = max_rollback
+        self.num_players = len(game.legs)
+
+        # Snapshot ring: row frame % ring holds the state before that frame was simulated
+        self.state = GameState(game)
+        ring = max_rollback + 2
+        self.snapshots = np.zeros((ring, self.state.size))
+        self.rng_states = [None] * ring
+
+        # Legs replay the inputs chosen for each frame
+        self.player_inputs = []
+        for leg in game.legs:
+            leg.input = PlayerInput(leg.ankle_pos.x, leg.ankle_pos.y)
+            self.player_inputs.append(leg.input)
+        self.rest_inputs = [player_input.input for player_input in self.player_inputs]
+
+        self.frame = 0  # Next frame to simulate
+        self.inputs = [{} for _ in range(self.num_players)]  # Known inputs per player: frame -> input
+        self.predicted = [{} for _ in range(self.num_players)]  # Predictions used: frame -> input
+        self.confirmed = [-1] * self.num_players  # Inputs are known up to this frame
+        self.acked = [-1] * self.num_players  # Each peer has our inputs up to this frame
+        self.rollback_from = None  # Earliest frame simulated with a wrong prediction
+        self.checksums = {}  # Frame -> CRC of its final state
+
+        # Counters
+        self.rollbacks = 0
+        self.resimulated_frames = 0
+        self.stalls = 0
+        self.tick_seconds = collections.deque(maxlen=FPS * 60)
+
+    def remote_players(self):
+        return [player for player in range(self.num_players) if player != self.player]
+
+    def tick(self):
+        """Advance one frame. Returns False if stalled waiting for remote inputs."""
+        start = time.perf_counter()
+        for packet in self.endpoint.receive():
+            self.receive(*packet)
+
+        stalled = any(self.frame - self.confirmed[player] > self.max_rollback for player in self.remote_players())
+        if stalled:
+            self.stalls += 1
+        else:
+            x, y = self.input_source.get_pos()
+            velocity = self.input_source.get_velocity()
+            self.inputs[self.player][self.frame] = (x, y, velocity.x, velocity.y)
+            self.confirmed[self.player] = self.frame
+        self.send()
+
+        if not stalled:
+            if self.rollback_from is not None:
+                self.rollback()
+            self.save(self.frame)
+            self.record_checksums()
+            self.simulate(self.frame)
+            self.frame += 1
+            self.prune()
+        self.tick_seconds.append(time.perf_counter() - start)
+        return not stalled
+
+    def send(self):
+        local = self.inputs[self.player]
+        for player in self.remote_players():
+            first = self.acked[player] + 1
+            inputs = tuple(local[frame] for frame in range(first, self.confirmed[self.player] + 1))
+            self.endpoint.send(player, (self.player, self.confirmed[player], first, inputs))
+
+    def receive(self, sender, ack, first, inputs):
+        self.acked[sender] = max(self.acked[sender], ack)
+        known = self.inputs[sender]
+        for frame, value in enumerate(inputs, first):
+            if frame <= self.confirmed[sender] or frame in known:
+                continue
+            known[frame] = value
+            predicted = self.predicted[sender].pop(frame, None)
+            if predicted is not None and predicted != value:
+                if self.rollback_from is None or frame < self.rollback_from:
+                    self.rollback_from = frame
+        while self.confirmed[sender] + 1 in known:
+            self.confirmed[sender] += 1
+
+    def input_for(self, player, frame):
+        value = self.inputs[player].get(frame)
+        if value is None:
+            # Predict that the player keeps doing what they did last
+            confirmed = self.confirmed[player]
+            value = self.inputs[player][confirmed] if confirmed >= 0 else self.rest_inputs[player]
+            self.predicted[player][frame] = value
+        return value
+
+    def simulate(self, frame):
+        for player, player_input in enumerate(self.player_inputs):
+            player_input.set(self.input_for(player, frame))
+        self.game.update()
+        if not self.game.running:
+            self.game.reset()
+
+    def save(self, frame):
+        slot = frame % len(self.snapshots)
+        self.rng_states[slot] = self.state.pack(self.snapshots[slot])
+
+    def load(self, frame):
+        slot = frame % len(self.snapshots)
+        self.state.unpack(self.snapshots[slot], self.rng_states[slot])
+
+    def rollback(self):
+        """Restore the first mispredicted frame and re-simulate up to the present."""
+        first = self.rollback_from
+        self.rollback_from = None
+        self.rollbacks += 1
+        self.load(first)
+        self.resimulate(first, self.frame)
+
+    def resimulate(self, first, end):
+        game = self.game
+        muted = [(owner, owner.listeners) for owner in game.legs + game.footbags]
+        for owner, _ in muted:
+            owner.listeners = []
+        try:
+            for frame in range(first, end):
+                if frame > first:
+                    self.save(frame)
+                self.simulate(frame)
+                self.resimulated_frames += 1
+        finally:
+            for owner, listeners in muted:
+                owner.listeners = listeners
+
+    def record_checksums(self):
+        """Hash the states whose inputs are all confirmed; they match on every peer."""
+        final = min(min(self.confirmed) + 1, self.frame)
+        first = max(self.frame - len(self.snapshots) + 1, max(self.checksums, default=-1) + 1)
+        for frame in range(first, final + 1):
+            self.checksums[frame] = zlib.crc32(self.snapshots[frame % len(self.snapshots)].tobytes())
+
+    def prune(self):
+        """Forget inputs and checksums that can no longer be needed."""
+        horizon = self.frame - len(self.snapshots)
+        for player, known in enumerate(self.inputs):
+            # Keep our own inputs until every peer has them, and the last confirmed input
+            keep_from = min(horizon, min(self.acked) + 1 if player == self.player else self.confirmed[player])
+            for frame in [frame for frame in known if frame < keep_from]:
+                del known[frame]
+        for predicted in self.predicted:
+            for frame in [frame for frame in predicted if frame < horizon]:
+                del predicted[frame]
+        if len(self.checksums) > FPS * 60:
+            for frame in sorted(self.checksums)[:FPS * 30]:
+                del self.checksums[frame]
+
+def create_peers(num_players=2, latency=3, jitter=0, loss=0.0, max_rollback=8, seed=0):
+    """Create one bot-driven game and rollback session per player on a loopback network."""
+    if not pygame.get_init():
+        pygame.init()
+    network = LoopbackNetwork(latency, jitter, loss, seed)
+    sessions = []
+    for player in range(num_players):
+        # Every peer starts from the same random state
+        game = Game(ScoreStore(":memory:"), num_players=num_players, seed=seed)
+        bot = AutoPlayer(game, leg=game.legs[player])
+        sessions.append(RollbackSession(game, player, network.endpoint(player), bot, max_rollback))
+    return network, sessions
+
+def run_loopback(frames, **options):
+    """Run the peers for `frames` frames and check that their confirmed states agree."""
+    network, sessions = create_peers(**options)
+    start = time.perf_counter()
+    while min(session.frame for session in sessions) < frames:
+        for session in sessions:
+            session.tick()
+        network.advance()
+    elapsed = time.perf_counter() - start
+
+    common = set.intersection(*(set(session.checksums) for session in sessions))
+    desyncs = [frame for frame in sorted(common)
+               if len({session.checksums[frame] for session in sessions}) > 1]
+    return {
+        "seconds": elapsed,
+        "network": network,
+        "sessions": sessions,
+        "checked_frames": len(common),
+        "desyncs": desyncs,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run rollback peers over a lossy loopback network")
+    parser.add_argument("--frames", type=int, default=3000, help="frames to simulate per peer")
+    parser.add_argument("--players", type=int, default=2, help="number of players")
+    parser.add_argument("--latency", type=int, default=3, help="one-way latency in frames")
+    parser.add_argument("--jitter", type=int, default=1, help="extra random latency in frames")
+    parser.add_argument("--loss", type=float, default=0.05, help="packet loss probability")
+    parser.add_argument("--max-rollback", type=int, default=8, help="frames a peer may run ahead")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the games and the network")
+    args = parser.parse_args()
+
+    result = run_loopback(args.frames, num_players=args.players, latency=args.latency, jitter=args.jitter,
+                          loss=args.loss, max_rollback=args.max_rollback, seed=args.seed)
+    network = result["network"]
+    print(f"{args.frames} frames x {args.players} peers in {result['seconds']:.2f}s; "
+          f"{network.dropped} of {network.sent} packets dropped")
+    for session in result["sessions"]:
+        ticks = np.array(session.tick_seconds)
+        print(f"  player {session.player}: score {session.game.score}, {session.rollbacks} rollbacks, "
+              f"{session.resimulated_frames} frames resimulated, {session.stalls} stalls, "
+              f"tick mean {ticks.mean() * 1e3:.3f} ms, max {ticks.max() * 1e3:.3f} ms")
+    print(f"{result['checked_frames']} confirmed frames compared, {len(result['desyncs'])} desynced")
+    raise SystemExit(1 if result["desyncs"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import time
+import zlib
+import numpy as np
+import pygame
+from src.constants import WIDTH, HEIGHT
+from src.game import spawn_seeds
+from src.headless import create_game
+from src.bot import AutoPlayer
+from src.input import ScriptedInput
+from src.softbody import SoftBodySolver
+from src.state import GameState
+from src.stats import GameplayStats
+
+# Example scenarios shipped with the game
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scenarios")
+
+# Footbag attributes a scenario may override
+PHYSICS = ("gravity", "elasticity", "damping")
+
+# Names available to ankle path formulas, besides the frame number t
+FORMULA_NAMES = {name: getattr(np, name) for name in (
+    "sin", "cos", "tan", "arctan2", "sqrt", "abs", "exp", "log", "minimum", "maximum", "clip", "where", "floor",
+    "mod", "sign", "pi",
+)}
+FORMULA_NAMES.update(WIDTH=WIDTH, HEIGHT=HEIGHT)
+
+class Scenario:
+    """A scenario file compiled to arrays, ready to set up and drive a Game.
+
+    Scenarios are JSON objects:
+
+        name, description   free text
+        frames              frames to run (default 600)
+        seed                seed for random placements and the game (default 0)
+        restart             set the scenario up again after a game over (default true)
+        soft_body           soft-body solver iterations (default 0)
+        physics             footbag constants: gravity (positive), elasticity, damping
+        legs                a number of bot-played legs, or a list of
+                            {"hip": [x, y], "ankle": <path>}; a missing hip is spread
+                            along the ground like Game does
+        footbags            a list of groups {"count": n, "position": <points>,
+                            "velocity": <points>}
+        expect              optional {"checksum": "hex crc32", "score": s, "games": g}
+                            checked after a full run
+
+    <points> is [x, y] for every footbag of the group, or {"uniform": [low, high]},
+    {"normal": [mean, std]} or {"linspace": [first, last]} with [x, y] pairs. An ankle
+    <path> is "bot", [x, y] to hold still, {"keyframes": [[frame, x, y], ...], "loop":
+    false} for linear interpolation, or {"formula": {"x": expr, "y": expr}} with numpy
+    expressions of the frame number t (only numpy functions and WIDTH and HEIGHT are
+    available, but formulas are still evaluated, so only run scenario files you trust).
+    Paths run from frame 0 again after every restart, and cover runs longer than
+    `frames` too.
+    """
+
+    def __init__(self, spec, name=None):
+        unknown = set(spec) - {"name", "description", "frames", "seed", "restart", "soft_body", "physics", "legs",
+                               "footbags", "expect"}
+        if unknown:
+            raise ValueError(f"unknown scenario keys: {', '.join(sorted(unknown))}")
+        self.name = spec.get("name", name or "scenario")
+        self.description = spec.get("description", "")
+        self.frames = int(spec.get("frames", 600))
+        self.seed = spec.get("seed", 0)
+        self.restart = bool(spec.get("restart", True))
+        self.soft_body = int(spec.get("soft_body", 0))
+        self.expect = spec.get("expect", {})
+        self.physics = dict(spec.get("physics", {}))
+        for key in self.physics:
+            if key not in PHYSICS:
+                raise ValueError(f"unknown physics constant {key!r}, expected one of {', '.join(PHYSICS)}")
+        # Reach sleeping bounds a footbag's travel assuming it falls
+        if self.physics.get("gravity", 1) <= 0:
+            raise ValueError(f"gravity must be positive, got {self.physics['gravity']}")
+
+        # Placements and the game draw from separate streams
+        placement_seed, self.game_seed = spawn_seeds(self.seed, 2)
+        rng = np.random.default_rng(placement_seed)
+
+        legs = spec.get("legs", 1)
+        if isinstance(legs, int):
+            legs = [{} for _ in range(legs)]
+        if not legs:
+            raise ValueError("a scenario needs at least one leg")
+        self.hips = np.array([
+            leg.get("hip", ((i + 1) * WIDTH // (len(legs) + 1), HEIGHT - 270)) for i, leg in enumerate(legs)
+        ], dtype=np.float64)
+        self.ankle_specs = [leg.get("ankle", "bot") for leg in legs]
+        # One (frames, 2) array per leg, or None for a bot; compiled now so bad paths fail on load
+        self.ankle_paths = [self.compile_path(spec, self.frames) for spec in self.ankle_specs]
+
+        positions, velocities = [], []
+        for group in spec.get("footbags", [{}]):
+            count = int(group.get("count", 1))
+            positions.append(self.compile_points(group.get("position", [WIDTH // 2, HEIGHT // 2]), count, rng))
+            velocities.append(self.compile_points(group.get("velocity", [0, -6]), count, rng))
+        self.footbag_positions = np.concatenate(positions)
+        self.footbag_velocities = np.concatenate(velocities)
+        if not len(self.footbag_positions):
+            raise ValueError("a scenario needs at least one footbag")
+
+    @classmethod
+    def load(cls, path):
+        """Load a scenario file; a bare name is looked up among the example scenarios."""
+        if not os.path.exists(path) and not os.path.dirname(path):
+            path = os.path.join(SCENARIO_DIR, path if path.endswith(".json") else path + ".json")
+        with open(path) as scenario_file:
+            return cls(json.load(scenario_file), os.path.splitext(os.path.basename(path))[0])
+
+    @staticmethod
+    def compile_points(spec, count, rng):
+        """A (count, 2) array of points from a <points> spec."""
+        if isinstance(spec, dict):
+            if len(spec) != 1:
+                raise ValueError(f"a point spec has exactly one kind, got {sorted(spec)}")
+            (kind, (a, b)), = spec.items()
+            a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+            if kind == "uniform":
+                return rng.uniform(a, b, (count, 2))
+            if kind == "normal":
+                return rng.normal(a, b, (count, 2))
+            if kind == "linspace":
+                return np.linspace(a, b, count) if count > 1 else a[None, :]
+            raise ValueError(f"unknown point spec {kind!r}")
+        return np.tile(np.asarray(spec, dtype=np.float64), (count, 1))
+
+    @staticmethod
+    def compile_path(spec, frames):
+        """A (frames, 2) array of ankle targets from a <path> spec, or None for a bot."""
+        t = np.arange(frames, dtype=np.float64)
+        if spec == "bot":
+            return None
+        if isinstance(spec, list):
+            return np.tile(np.asarray(spec, dtype=np.float64), (frames, 1))
+        if "keyframes" in spec:
+            keyframes = np.asarray(spec["keyframes"], dtype=np.float64)
+            if keyframes.ndim != 2 or keyframes.shape[1] != 3:
+                raise ValueError("keyframes are [frame, x, y] triples")
+            if spec.get("loop", False):
+                t = t % keyframes[-1, 0]
+            return np.column_stack((np.interp(t, keyframes[:, 0], keyframes[:, 1]),
+                                    np.interp(t, keyframes[:, 0], keyframes[:, 2])))
+        if "formula" in spec:
+            names = dict(FORMULA_NAMES, t=t)
+            axes = [eval(spec["formula"][axis], {"__builtins__": {}}, names) for axis in ("x", "y")]
+            return np.column_stack([np.broadcast_to(np.asarray(axis, dtype=np.float64), t.shape) for axis in axes])
+        raise ValueError(f"unknown ankle path {spec!r}")
+
+    def build_game(self, frames=None):
+        """Create a headless Game set up as the scenario describes.
+
+        Ankle paths cover `frames` frames (default: the scenario's length) from every
+        set_up(); past their end a scripted leg holds its last point.
+        """
+        paths = self.ankle_paths
+        if frames is not None and frames > self.frames:
+            paths = [self.compile_path(spec, frames) for spec in self.ankle_specs]
+        soft_body = SoftBodySolver(self.soft_body) if self.soft_body else None
+        game = create_game(num_footbags=len(self.footbag_positions), seed=self.game_seed, soft_body=soft_body,
+                           num_players=len(self.hips))
+        for leg, hip, path in zip(game.legs, self.hips.tolist(), paths):
+            leg.hip_pos.update(hip)
+            leg.input = ScriptedInput(path.tolist()) if path is not None else AutoPlayer(game, leg=leg)
+        game.input = game.leg.input
+        self.set_up(game)
+        return game
+
+    def set_up(self, game):
+        """Put the legs and footbags of a (reset) game at the scenario's start."""
+        for leg in game.legs:
+            leg.reset()
+            if isinstance(leg.input, ScriptedInput):
+                leg.input.reset()
+        for footbag, position, velocity in zip(game.footbags, self.footbag_positions.tolist(),
+                                               self.footbag_velocities.tolist()):
+            for key, value in self.physics.items():
+                setattr(footbag, key, value)
+            footbag.reset(position)
+            footbag.velocity.update(velocity)
+        for reach_sleep in game.reach_sleeps:
+            reach_sleep.reset()
+
+    def run(self, frames=None, draw=False):
+        """Run the scenario headlessly. Returns a dict with the outcome and a state checksum."""
+        frames = self.frames if frames is None else frames
+        game = self.build_game(frames)
+        stats = GameplayStats()
+        stats.attach(game)
+        surface = pygame.Surface((WIDTH, HEIGHT)) if draw else None
+        games = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            game.update()
+            if surface is not None:
+                game.draw(surface)
+            if not game.running and self.restart:
+                games += 1
+                game.reset()
+                self.set_up(game)
+        elapsed = time.perf_counter() - start
+
+        state = GameState(game)
+        row = np.zeros(state.size)
+        state.pack(row)
+        return {
+            "frames": frames,
+            "seconds": elapsed,
+            "fps": frames / elapsed,
+            "games": games,
+            "score": game.score,
+            "hits": dict(stats.hits),
+            "checksum": f"{zlib.crc32(row.tobytes()):08x}",
+            "stats": stats,
+        }
+
+    def check(self, result):
+        """Differences between a run and the scenario's expectations, as messages."""
+        return [f"{key}: expected {expected}, got {result[key]}"
+                for key, expected in self.expect.items() if result[key] != expected]
+
+def list_scenarios():
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(SCENARIO_DIR) if name.endswith(".json"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Psychedelic Footbag scenarios headlessly")
+    parser.add_argument("scenarios", nargs="*", help="scenario files or names of example scenarios (default: all)")
+    parser.add_argument("--frames", type=int, help="override the number of frames")
+    parser.add_argument("--draw", action="store_true", help="also render every frame offscreen")
+    parser.add_argument("--stats", action="store_true", help="print gameplay statistics")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.scenarios or list_scenarios():
+        scenario = Scenario.load(path)
+        result = scenario.run(args.frames, args.draw)
+        hits = ", ".join(f"{part} {count}" for part, count in sorted(result["hits"].items())) or "none"
+        print(f"{scenario.name}: {result['frames']} frames in {result['seconds']:.2f}s ({result['fps']:.0f} fps), "
+              f"{result['games']} games over, score {result['score']}, hits: {hits}, "
+              f"checksum {result['checksum']}")
+        if args.stats:
+            print(result["stats"].report())
+        if args.frames is None:
+            for problem in scenario.check(result):
+                print(f"  MISMATCH {problem}")
+                failed = True
+    raise SystemExit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import time
+from itertools import chain
+import numpy as np
+
+class SoftBodySolver:
+    """Position-based dynamics constraints for footbag blobs, vectorized over every blob.
+
+    Run solve() after Footbag.update. It projects the blob points onto two constraints:
+    every edge between neighbouring points keeps its rest length, and the polygon keeps
+    its rest area. Each iteration projects all edges of all footbags at once (Jacobi
+    style, each point averaging the corrections of its two edges) and then the area of
+    every blob. The position corrections are added to the point velocities, so the blob
+    squishes under hard hits instead of collapsing or stretching.
+
+    `iterations` caps the work; with `budget_us` set, solving also stops once it has
+    used that many microseconds per blob.
+    """
+
+    def __init__(self, iterations=4, edge_stiffness=0.8, area_stiffness=0.5, budget_us=None):
+        self.iterations = iterations
+        self.edge_stiffness = edge_stiffness
+        self.area_stiffness = area_stiffness
+        self.budget_us = budget_us
+        self._rest = {}  # Shape key -> (edge lengths, area, neighbour indices)
+
+        # Counters
+        self.solves = 0
+        self.iterations_run = 0
+
+    @staticmethod
+    def area(z):
+        """Signed area of every blob polygon (shoelace formula), points as complex numbers."""
+        return 0.5 * (np.conj(z) * np.roll(z, -1, axis=-1)).imag.sum(axis=-1)
+
+    def rest_shape(self, footbag):
+        key = (footbag.num_points, footbag.base_radius)
+        rest = self._rest.get(key)
+        if rest is None:
+            z = np.array([complex(target.x, target.y) for target in footbag.target_points])
+            # Neighbour indices around the blob
+            following = np.roll(np.arange(footbag.num_points), -1)
+            previous = np.roll(np.arange(footbag.num_points), 1)
+            rest = self._rest[key] = (np.abs(z[following] - z), self.area(z), following, previous)
+        return rest
+
+    def project_edges(self, z, rest_lengths, following, previous):
+        edges = z[:, following] - z
+        lengths = np.abs(edges)
+        # Half of each edge's stretch goes to either end
+        corrections = (0.5 * (lengths - rest_lengths) / np.maximum(lengths, 1e-9)) * edges
+        z += (0.5 * self.edge_stiffness) * (corrections - corrections[:, previous])
+
+    def project_area(self, z, rest_area, following, previous):
+        z_next = z[:, following]
+        span = z_next - z[:, previous]
+        # The gradient of the area at each point is -0.5j * span
+        area = 0.5 * (np.conj(z) * z_next).imag.sum(axis=1)
+        norm = 0.25 * (span.real ** 2 + span.imag ** 2).sum(axis=1)
+        scale = self.area_stiffness * (rest_area - area) / np.maximum(norm, 1e-9)
+        z += (-0.5j * scale)[:, None] * span
+
+    def solve(self, footbags):
+        """Apply the constraints to a list of footbags with the same number of points."""
+        if not footbags:
+            return
+        start = time.perf_counter()
+        deadline = start + self.budget_us * 1e-6 * len(footbags) if self.budget_us is not None else None
+        count = len(footbags)
+        num_points = footbags[0].num_points
+        rest_lengths, rest_area, following, previous = self.rest_shape(footbags[0])
+
+        # Points of all footbags as complex numbers, shape (footbags, points)
+        z = np.fromiter(
+            chain.from_iterable(chain.from_iterable(footbag.points for footbag in footbags)),
+            np.float64, count=count * num_points * 2,
+        ).view(np.complex128).reshape(count, num_points)
+        predicted = z.copy()
+        for _ in range(self.iterations):
+            self.project_edges(z, rest_lengths, following, previous)
+            self.project_area(z, rest_area, following, previous)
+            self.iterations_run += 1
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        self.solves += 1
+
+        # Write back, turning the corrections into velocity
+        corrections = (z - predicted).view(np.float64).reshape(count, num_points, 2).tolist()
+        points = z.view(np.float64).reshape(count, num_points, 2).tolist()
+        for footbag, footbag_points, footbag_corrections in zip(footbags, points, corrections):
+            for point, point_velocity, (x, y), (dx, dy) in zip(
+                footbag.points, footbag.point_velocities, footbag_points, footbag_corrections
+            ):
+                point.update(x, y)
+                point_velocity.x += dx
+                point_velocity.y += dy
+            footbag.update_geometry()
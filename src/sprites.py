@@ -0,0 +1,77 @@
+import collections
+from itertools import chain
+import numpy as np
+import pygame
+from src.constants import WIDTH, COLORS
+
+class FootbagSprites:
+    """Draws many footbags from an LRU cache of pre-rasterized blob shapes.
+
+    Blob point offsets from the centre are rounded to a grid of `quantization` world
+    units, so footbags in nearly the same deformation state and colour share a sprite.
+    Every point is drawn at most quantization * sqrt(2) / 2 away from where it really is.
+    The offsets of all footbags are quantized in one vectorized pass, and all footbags
+    are then drawn with a single Surface.blits call.
+    """
+
+    def __init__(self, cache_size=1024, quantization=1.5):
+        self.cache_size = cache_size
+        self.quantization = quantization
+        self.cache = collections.OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+    def quantize(self, footbags):
+        """Quantized point offsets of all footbags, as an int16 (footbags, points, 2) array."""
+        count = len(footbags)
+        num_points = footbags[0].num_points
+        points = np.fromiter(
+            chain.from_iterable(chain.from_iterable(footbag.points for footbag in footbags)),
+            np.float64, count=count * num_points * 2,
+        ).reshape(count, num_points, 2)
+        centers = np.fromiter(
+            chain.from_iterable(footbag.position for footbag in footbags), np.float64, count=count * 2
+        ).reshape(count, 1, 2)
+        return np.rint((points - centers) / self.quantization).astype(np.int16)
+
+    def rasterize(self, offsets, color_index, base_radius, scale):
+        """Draw a blob shape into its own sprite. Returns (sprite, centre offset)."""
+        q = self.quantization * scale
+        extent = int(np.abs(offsets).max()) * q
+        half = int(max(extent, base_radius * 0.5 * scale)) + 2
+        sprite = pygame.Surface((2 * half, 2 * half))
+        sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+
+        color = COLORS[color_index]
+        pygame.draw.polygon(sprite, color, [(half + x * q, half + y * q) for x, y in offsets.tolist()])
+        glow_color = (min(color[0] + 50, 255), min(color[1] + 50, 255), min(color[2] + 50, 255))
+        pygame.draw.circle(sprite, glow_color, (half, half), max(1, int(base_radius * 0.5 * scale)))
+        return sprite, half
+
+    def get(self, offsets, footbag, scale):
+        key = (offsets.tobytes(), footbag.color_index, footbag.base_radius, scale)
+        entry = self.cache.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self.rasterize(offsets, footbag.color_index, footbag.base_radius, scale)
+            self.cache[key] = entry
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.hits += 1
+            self.cache.move_to_end(key)
+        return entry
+
+    def draw(self, surface, footbags):
+        """Draw all footbags in one batched blit."""
+        if not footbags:
+            return
+        scale = surface.get_width() / WIDTH
+        offsets = self.quantize(footbags)
+        blits = []
+        for footbag, footbag_offsets in zip(footbags, offsets):
+            sprite, half = self.get(footbag_offsets, footbag, scale)
+            blits.append((sprite, (int(footbag.position.x * scale) - half, int(footbag.position.y * scale) - half)))
+        surface.blits(blits, doreturn=False)
@@ -0,0 +1,88 @@
+import numpy as np
+import pygame
+
+class GameState:
+    """Packs the simulation state of a Game into one flat float64 row and back.
+
+    The row holds the score and the cosmetic timers advanced by Game.update, then the
+    knee and ankle of every leg, then per footbag its position, velocity, blob points and
+    point velocities, colour and collision state. Saving a frame packs into a preallocated
+    row and restoring unpacks it, so no game objects are rebuilt. The state of the game's
+    random generator is kept next to the row as the small dict its bit generator returns.
+
+    Rows can be copied around (or hashed) as plain bytes.
+    """
+
+    HEADER_SIZE = 7
+    LEG_SIZE = 4
+
+    def __init__(self, game):
+        self.game = game
+        num_points = game.footbag.num_points
+        # position, velocity, points, point velocities, colour index and timer,
+        # collision timer, wall hits, last collision normal (NaN when there is none)
+        self.footbag_size = 2 + 2 + 4 * num_points + 6
+        self.size = self.HEADER_SIZE + self.LEG_SIZE * len(game.legs) + self.footbag_size * len(game.footbags)
+
+    def pack(self, out):
+        """Write the current state into the float64 array `out`. Returns the RNG state."""
+        game = self.game
+        values = [
+            game.score, game.running, game.bg_color_index, game.bg_color_timer,
+            game.title_color_index, game.title_color_timer, game.title_wave_time,
+        ]
+        for leg in game.legs:
+            values += (leg.knee_pos.x, leg.knee_pos.y, leg.ankle_pos.x, leg.ankle_pos.y)
+        for footbag in game.footbags:
+            values += footbag.position
+            values += footbag.velocity
+            for point in footbag.points:
+                values += point
+            for point_velocity in footbag.point_velocities:
+                values += point_velocity
+            last_collision = footbag.last_collision if footbag.last_collision is not None else (np.nan, np.nan)
+            values += (footbag.color_index, footbag.color_timer, footbag.collision_timer, footbag.wall_hits)
+            values += last_collision
+        out[:] = values
+        return game.rng.bit_generator.state
+
+    def unpack(self, row, rng_state=None):
+        """Restore the state saved by pack(). The RNG is left alone without `rng_state`."""
+        game = self.game
+        values = row.tolist()
+        game.score = int(values[0])
+        game.running = bool(values[1])
+        game.bg_color_index = int(values[2])
+        game.bg_color_timer = values[3]
+        game.title_color_index = int(values[4])
+        game.title_color_timer = int(values[5])
+        game.title_wave_time = values[6]
+        i = self.HEADER_SIZE
+        for leg in game.legs:
+            leg.knee_pos = pygame.Vector2(values[i], values[i + 1])
+            leg.ankle_pos = pygame.Vector2(values[i + 2], values[i + 3])
+            leg.update_geometry()
+            i += self.LEG_SIZE
+        for footbag in game.footbags:
+            footbag.position.update(values[i], values[i + 1])
+            footbag.velocity = pygame.Vector2(values[i + 2], values[i + 3])
+            i += 4
+            for point in footbag.points:
+                point.update(values[i], values[i + 1])
+                i += 2
+            for point_velocity in footbag.point_velocities:
+                point_velocity.update(values[i], values[i + 1])
+                i += 2
+            footbag.color_index = int(values[i])
+            footbag.color_timer = int(values[i + 1])
+            footbag.collision_timer = int(values[i + 2])
+            footbag.wall_hits = int(values[i + 3])
+            x, y = values[i + 4], values[i + 5]
+            footbag.last_collision = None if x != x else pygame.Vector2(x, y)
+            footbag.update_geometry()
+            i += 6
+        # Sleeping is only safe along the trajectory it was computed for
+        for reach_sleep in game.reach_sleeps:
+            reach_sleep.reset()
+        if rng_state is not None:
+            game.rng.bit_generator.state = rng_state
@@ -0,0 +1,223 @@
+import collections
+import math
+from src.constants import HEIGHT
+
+class RunningStats:
+    """Count, mean, variance, minimum and maximum of a stream, in constant memory.
+
+    Uses Welford's update, and Chan et al.'s formula to merge two streams.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+class Histogram:
+    """Counts of values in `buckets` equal-width buckets over [low, high).
+
+    Values outside the range are counted in an underflow and an overflow bucket.
+    """
+
+    def __init__(self, low, high, buckets):
+        self.low = low
+        self.high = high
+        self.width = (high - low) / buckets
+        # Underflow, the buckets, overflow
+        self.counts = [0] * (buckets + 2)
+
+    def add(self, value):
+        index = math.floor((value - self.low) / self.width) + 1
+        self.counts[min(max(index, 0), len(self.counts) - 1)] += 1
+
+    def merge(self, other):
+        if (other.low, other.high, len(other.counts)) != (self.low, self.high, len(self.counts)):
+            raise ValueError("histograms have different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def edges(self):
+        """Lower edge of every bucket, including the underflow (-inf) and overflow ones."""
+        return [-math.inf] + [self.low + i * self.width for i in range(len(self.counts) - 1)]
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative error guarantees (DDSketch style).
+
+    Positive values go into logarithmic buckets, bucket i holding (gamma^(i-1), gamma^i],
+    so any quantile is answered within `relative_accuracy` of a true value. Values up to
+    zero share one bucket. The number of buckets grows only with the logarithm of the
+    value range, and two sketches with the same accuracy merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = collections.Counter()
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self.log_gamma)] += 1
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("sketches have different accuracies")
+        self.buckets.update(other.buckets)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q):
+        """Value at quantile `q` (0 to 1), or NaN for an empty sketch."""
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket in relative terms
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+class StreamStats:
+    """Running moments, a histogram and a quantile sketch of one stream of values."""
+
+    def __init__(self, low, high, buckets):
+        self.moments = RunningStats()
+        self.histogram = Histogram(low, high, buckets)
+        self.sketch = QuantileSketch()
+
+    def add(self, value):
+        self.moments.add(value)
+        self.histogram.add(value)
+        self.sketch.add(value)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.histogram.merge(other.histogram)
+        self.sketch.merge(other.sketch)
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        moments = self.moments
+        summary = {"count": moments.count, "mean": moments.mean, "std": moments.std,
+                   "min": moments.min, "max": moments.max}
+        for q in quantiles:
+            summary[f"p{round(q * 100)}"] = self.sketch.quantile(q)
+        return summary
+
+class GameplayStats:
+    """Constant-memory statistics over the gameplay events of many games.
+
+    Tracks kick speed, bounce height (the highest point a footbag reached between two
+    touches) and airtime (frames between two touches of the same footbag), plus how
+    often the foot, the calf, the side walls and the ceiling were hit. Kicks and wall
+    hits arrive through the listener hooks; observe() is called once per footbag and
+    frame by Game.update. Nothing per event is stored, so summary() can be called at any
+    time, and stats from parallel workers combine with merge().
+    """
+
+    def __init__(self, ground_y=HEIGHT):
+        self.ground_y = ground_y
+        self.streams = {
+            "kick_speed": StreamStats(0, 30, 30),
+            "bounce_height": StreamStats(0, 600, 30),
+            "airtime": StreamStats(0, 300, 30),
+        }
+        self.hits = collections.Counter()
+        self.footbags = {}  # id(footbag) -> [frames since last touch or None, highest point since]
+
+    def attach(self, game):
+        """Listen to the legs and footbags of a game and have it call observe()."""
+        for leg in game.legs:
+            leg.listeners.append(self)
+        for footbag in game.footbags:
+            footbag.listeners.append(self)
+        game.observers.append(self)
+
+    def reset(self):
+        """Forget the touches of the last game; the statistics are kept."""
+        self.footbags.clear()
+
+    def observe(self, footbag):
+        state = self.footbags.get(id(footbag))
+        if state is None:
+            state = self.footbags[id(footbag)] = [None, footbag.position.y]
+        if state[0] is not None:
+            state[0] += 1
+        if footbag.position.y < state[1]:
+            state[1] = footbag.position.y
+
+    def on_kick(self, leg, footbag, part, speed):
+        self.hits[part] += 1
+        self.streams["kick_speed"].add(speed)
+        state = self.footbags.get(id(footbag))
+        if state is not None:
+            # Airtime and height count from the previous touch only
+            if state[0] is not None:
+                self.streams["airtime"].add(state[0])
+                self.streams["bounce_height"].add(self.ground_y - state[1])
+            state[0] = 0
+            state[1] = footbag.position.y
+
+    def on_wall_hit(self, footbag, normal):
+        self.hits["ceiling" if normal.y > 0 else "wall"] += 1
+
+    def merge(self, other):
+        for name, stream in self.streams.items():
+            stream.merge(other.streams[name])
+        self.hits.update(other.hits)
+
+    def summary(self):
+        """Summaries of every stream and the hit counts."""
+        summary = {name: stream.summary() for name, stream in self.streams.items()}
+        summary["hits"] = dict(self.hits)
+        return summary
+
+    def report(self):
+        """The summary as readable lines."""
+        lines = []
+        for name, stream in self.streams.items():
+            values = stream.summary()
+            lines.append(f"{name:14s} n={values['count']:<7d} mean {values['mean']:8.2f}  std {values['std']:7.2f}  "
+                         f"p50 {values['p50']:8.2f}  p90 {values['p90']:8.2f}  p99 {values['p99']:8.2f}  "
+                         f"max {values['max']:8.2f}")
+        hits = ", ".join(f"{part} {count}" for part, count in sorted(self.hits.items()))
+        lines.append(f"hits: {hits or 'none'}")
+        return "\n".join(lines)
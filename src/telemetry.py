@@ -0,0 +1,205 @@
+import glob
+import json
+import os
+import queue
+import threading
+from itertools import chain
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Leg part codes in the kick events
+PARTS = {"foot": 0, "calf": 1}
+
+class TelemetryRecorder:
+    """Streams the state of every frame of a game into chunked columnar files.
+
+    Call record() once per frame after Game.update. Per-frame columns (frame, score,
+    footbag position, velocity and blob points, knee and ankle of every leg) are filled
+    into preallocated chunk buffers of `chunk_frames` rows. Kicks and wall hits arrive
+    through the listener hooks and go into per-chunk event tables.
+
+    Full chunks are handed to a writer thread through a queue of at most `max_pending`
+    chunks, and their buffers are reused once written, so memory stays bounded however
+    long the run is. If the disk cannot keep up, record() waits for the writer.
+
+    With format "npy" every column is written to <directory>/<column>/<chunk>.npy; with
+    "parquet" (needs pyarrow) every chunk is one <directory>/<chunk>.parquet file, with
+    array columns flattened to fixed-size lists. A manifest.json describes the columns.
+    """
+
+    def __init__(self, game, directory, chunk_frames=4096, max_pending=4, format="npy"):
+        if format == "parquet" and pyarrow is None:
+            raise RuntimeError("Parquet telemetry needs pyarrow")
+        self.game = game
+        self.directory = directory
+        self.chunk_frames = chunk_frames
+        self.format = format
+        self.footbag_index = {id(footbag): i for i, footbag in enumerate(game.footbags)}
+        self.leg_index = {id(leg): i for i, leg in enumerate(game.legs)}
+        num_footbags = len(game.footbags)
+        num_points = game.footbag.num_points
+        num_legs = len(game.legs)
+        self.columns = {
+            "frame": ((), np.int64),
+            "score": ((), np.int32),
+            "footbag_position": ((num_footbags, 2), np.float32),
+            "footbag_velocity": ((num_footbags, 2), np.float32),
+            "footbag_points": ((num_footbags, num_points, 2), np.float32),
+            "knee": ((num_legs, 2), np.float32),
+            "ankle": ((num_legs, 2), np.float32),
+        }
+        # Events: frame, leg or footbag index, part code or normal, speed
+        self.event_columns = {
+            "kicks": [("frame", np.int64), ("leg", np.int16), ("footbag", np.int16), ("part", np.int8),
+                      ("speed", np.float32)],
+            "wall_hits": [("frame", np.int64), ("footbag", np.int16), ("normal_x", np.float32),
+                          ("normal_y", np.float32)],
+        }
+
+        # Free chunk buffers; one is being filled, the others are queued or being written
+        self._free = queue.Queue()
+        for _ in range(max_pending + 1):
+            self._free.put(self._new_chunk())
+        self._pending = queue.Queue(max_pending)
+        self._chunk = self._free.get()
+        self._events = {name: [] for name in self.event_columns}
+        self.row = 0
+        self.frame = 0
+        self.chunks = 0
+        self.error = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer, name="telemetry-writer", daemon=True)
+        self._thread.start()
+        self._closed = False
+
+        for leg in game.legs:
+            leg.listeners.append(self)
+        for footbag in game.footbags:
+            footbag.listeners.append(self)
+
+    def _new_chunk(self):
+        return {name: np.zeros((self.chunk_frames,) + shape, dtype) for name, (shape, dtype) in self.columns.items()}
+
+    def on_kick(self, leg, footbag, part, speed):
+        self._events["kicks"].append(
+            (self.frame, self.leg_index[id(leg)], self.footbag_index[id(footbag)], PARTS[part], speed)
+        )
+
+    def on_wall_hit(self, footbag, normal):
+        self._events["wall_hits"].append((self.frame, self.footbag_index[id(footbag)], normal.x, normal.y))
+
+    def record(self):
+        """Record the frame Game.update just simulated."""
+        game = self.game
+        chunk = self._chunk
+        row = self.row
+        footbags = game.footbags
+        chunk["frame"][row] = self.frame
+        chunk["score"][row] = game.score
+        chunk["footbag_position"][row].flat = list(chain.from_iterable(footbag.position for footbag in footbags))
+        chunk["footbag_velocity"][row].flat = list(chain.from_iterable(footbag.velocity for footbag in footbags))
+        chunk["footbag_points"][row].flat = list(
+            chain.from_iterable(chain.from_iterable(footbag.points for footbag in footbags))
+        )
+        chunk["knee"][row].flat = list(chain.from_iterable(leg.knee_pos for leg in game.legs))
+        chunk["ankle"][row].flat = list(chain.from_iterable(leg.ankle_pos for leg in game.legs))
+        self.frame += 1
+        self.row += 1
+        if self.row == self.chunk_frames:
+            self._flush()
+
+    def _flush(self):
+        if self.error is not None:
+            raise RuntimeError("telemetry writer failed") from self.error
+        events = {
+            name: np.array(rows, dtype=self.event_columns[name]) for name, rows in self._events.items()
+        }
+        self._pending.put((self.chunks, self._chunk, self.row, events))
+        self.chunks += 1
+        self._events = {name: [] for name in self.event_columns}
+        self._chunk = self._free.get()
+        self.row = 0
+
+    def close(self):
+        """Write the partial last chunk, wait for the writer and write the manifest."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.row:
+            self._flush()
+        self._pending.put(None)
+        self._thread.join()
+        for leg in self.game.legs:
+            leg.listeners.remove(self)
+        for footbag in self.game.footbags:
+            footbag.listeners.remove(self)
+        manifest = {
+            "format": self.format,
+            "frames": self.frame,
+            "chunks": self.chunks,
+            "chunk_frames": self.chunk_frames,
+            "columns": {name: {"shape": list(shape), "dtype": np.dtype(dtype).str}
+                        for name, (shape, dtype) in self.columns.items()},
+            "events": {name: [[field, np.dtype(dtype).str] for field, dtype in fields]
+                       for name, fields in self.event_columns.items()},
+        }
+        with open(os.path.join(self.directory, "manifest.json"), "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        if self.error is not None:
+            raise RuntimeError("telemetry writer failed") from self.error
+
+    def _writer(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            index, chunk, rows, events = item
+            try:
+                if self.format == "parquet":
+                    self._write_parquet(index, chunk, rows, events)
+                else:
+                    self._write_npy(index, chunk, rows, events)
+            except Exception as error:
+                # Reported by the next flush; the thread keeps handing chunks back so record() never blocks
+                self.error = error
+            self._free.put(chunk)
+
+    def _write_npy(self, index, chunk, rows, events):
+        for name, values in chain(chunk.items(), events.items()):
+            column_dir = os.path.join(self.directory, name)
+            os.makedirs(column_dir, exist_ok=True)
+            values = values[:rows] if name in chunk else values
+            np.save(os.path.join(column_dir, f"{index:06d}.npy"), values)
+
+    def _write_parquet(self, index, chunk, rows, events):
+        arrays = {}
+        for name, values in chunk.items():
+            values = values[:rows]
+            if values.ndim > 1:
+                flat = pyarrow.array(values.reshape(-1))
+                arrays[name] = pyarrow.FixedSizeListArray.from_arrays(flat, values[0].size)
+            else:
+                arrays[name] = pyarrow.array(values)
+        pyarrow.parquet.write_table(pyarrow.table(arrays), os.path.join(self.directory, f"{index:06d}.parquet"))
+        for name, values in events.items():
+            table = pyarrow.table({field: values[field] for field in values.dtype.names})
+            pyarrow.parquet.write_table(table, os.path.join(self.directory, f"{name}-{index:06d}.parquet"))
+
+def load_column(directory, name, mmap=True):
+    """Concatenate a column (or event table) of an npy telemetry directory."""
+    with open(os.path.join(directory, "manifest.json")) as manifest_file:
+        manifest = json.load(manifest_file)
+    paths = sorted(glob.glob(os.path.join(directory, name, "*.npy")))
+    chunks = [np.load(path, mmap_mode="r" if mmap else None) for path in paths]
+    if chunks:
+        return np.concatenate(chunks)
+    if name in manifest["columns"]:
+        column = manifest["columns"][name]
+        return np.zeros([0] + column["shape"], column["dtype"])
+    return np.zeros(0, [tuple(field) for field in manifest["events"][name]])
@@ -0,0 +1,56 @@
+import math
+import pygame
+
+class MotionTrails:
+    """Motion trails kept in a persistent accumulation surface.
+
+    Every frame begin() fades the whole surface with one BLEND_RGB_MULT blit of a solid
+    grey surface (pygame's blended fill has no SIMD path and is some 30 times slower), the
+    caller draws only the current frame's objects into it, and composite() adds it onto
+    the screen. Older positions fade out by `fade` per frame instead of being redrawn,
+    so the cost is the same whatever the trail length.
+
+    pygame rounds the multiply up, so on its own it leaves dark channels stuck at a small
+    value (11 for a fade of 233/255) that composite() would keep adding to the screen.
+    A BLEND_RGB_SUB blit of 1 after it makes every channel drop to at most `fade` times
+    its value, so a pixel is black after at most log(1/255) / log(fade) frames.
+    """
+
+    def __init__(self, fade=0.85):
+        self.fade = fade
+        self.surface = None
+        self.fader = None  # Solid grey surface multiplied in to fade the trails
+        self.fader_level = None
+        self.floor = None  # Solid (1, 1, 1) surface subtracted after the multiply
+
+    @classmethod
+    def from_length(cls, frames):
+        """Trails that fade to black within `frames` frames."""
+        return cls(math.exp(math.log(1 / 255) / max(frames, 1)))
+
+    def clear(self):
+        if self.surface is not None:
+            self.surface.fill((0, 0, 0))
+
+    def begin(self, screen):
+        """Fade the trails of earlier frames and return the surface to draw this frame into."""
+        if self.surface is None or self.surface.get_size() != screen.get_size():
+            # (Re)created whenever the render resolution changes, in the screen's pixel format
+            self.surface = pygame.Surface(screen.get_size(), 0, screen)
+            self.surface.fill((0, 0, 0))
+            self.fader = pygame.Surface(screen.get_size(), 0, screen)
+            self.fader_level = None
+            self.floor = pygame.Surface(screen.get_size(), 0, screen)
+            self.floor.fill((1, 1, 1))
+        else:
+            level = round(self.fade * 255)
+            if level != self.fader_level:
+                self.fader.fill((level, level, level))
+                self.fader_level = level
+            self.surface.blit(self.fader, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+            self.surface.blit(self.floor, (0, 0), special_flags=pygame.BLEND_RGB_SUB)
+        return self.surface
+
+    def composite(self, screen):
+        """Add the trails onto the screen."""
+        screen.blit(self.surface, (0, 0), special_flags=pygame.BLEND_RGB_ADD)